@@ -0,0 +1,185 @@
+# ==============================================================================
+# Benchmark Skala Dashboard Survei
+# Mengukur waktu dan memori puncak setiap tahap (muat, multi-respon, normalisasi merek, Likert,
+# tabel silang, streaming, grafik) pada survei sintetis berbagai ukuran, lalu menulis hasilnya ke JSON.
+#
+# Contoh (dari root repo):
+#   python -m benchmarks.run_benchmarks --sizes 10000 100000 1000000 --output bench.json
+#   python -m benchmarks.run_benchmarks --sizes 100000 --baseline bench.json
+# ==============================================================================
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import survey_engine
+from benchmarks.synthetic_survey import make_synthetic_survey
+from survey_engine import (
+    LIKERT_AVERAGE_COLUMNS, LIKERT_PIVOT_PATTERNS, BrandNormalizer, build_crosstab_cube, build_report,
+    calculate_likert_average, count_multi_response, crosstab_from_cube, crosstab_intervals, encode_likert,
+    likert_pivot_columns, load_survey_file, multi_response_groups, pivot_dimension_options,
+    render_png, stream_survey_csv,
+)
+
+# Tahap yang melambat lebih dari ambang ini dibanding baseline dianggap regresi
+REGRESSION_THRESHOLD = 1.25
+
+
+def _measure(func, repeat, trace_memory):
+    """Waktu terbaik dari `repeat` kali jalan dan memori puncak (MB) dari satu jalan ber-tracemalloc."""
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        finally:
+            tracemalloc.stop()
+    return result, min(seconds), peak_mb
+
+
+def benchmark_size(n_rows, work_dir, seed, n_brands, chunksize, repeat, trace_memory, charts):
+    """Menjalankan semua tahap untuk satu ukuran survei."""
+    df = make_synthetic_survey(n_rows, seed=seed, n_brands=n_brands)
+    csv_path = os.path.join(work_dir, f'survey_{n_rows}.csv')
+    df.to_csv(csv_path, index=False)
+    del df
+
+    results = []
+
+    def run(stage, func, stage_repeat=repeat):
+        result, seconds, peak_mb = _measure(func, stage_repeat, trace_memory)
+        results.append({'rows': n_rows, 'stage': stage, 'seconds': round(seconds, 6),
+                        'peak_mb': None if peak_mb is None else round(peak_mb, 3)})
+        print(f"{n_rows:>10} {stage:<20} {seconds:9.4f}s"
+              + ('' if peak_mb is None else f" {peak_mb:10.1f} MB"), file=sys.stderr)
+        return result
+
+    def load_cold():
+        # Cache snapshot dikosongkan agar yang diukur adalah parse penuh
+        for name in os.listdir(survey_engine.INGEST_CACHE_DIR):
+            os.remove(os.path.join(survey_engine.INGEST_CACHE_DIR, name))
+        return load_survey_file(csv_path)
+
+    run('load_cold', load_cold, stage_repeat=1)
+    frame = run('load_snapshot', lambda: load_survey_file(csv_path))
+
+    groups = multi_response_groups(frame.columns)
+    run('multi_response', lambda: [count_multi_response(frame, cols) for cols in groups.values()])
+    # Normalizer dipakai ulang antar pengulangan: yang diukur adalah biaya saat pemetaan sudah hangat
+    normalizer = BrandNormalizer()
+    run('multi_response_norm', lambda: [
+        count_multi_response(frame, cols, normalizer) for cols in groups.values()
+    ])
+
+    likert = run('likert_encode', lambda: encode_likert(frame))
+    run('likert_averages', lambda: [calculate_likert_average(likert, cols) for cols in LIKERT_AVERAGE_COLUMNS.values()])
+
+    cube = run('crosstab_cube', lambda: build_crosstab_cube(frame, likert))
+    run('crosstab_pivots', lambda: [
+        crosstab_from_cube(cube, dims, likert_pivot_columns(cube, category))
+        for category in LIKERT_PIVOT_PATTERNS for dims in pivot_dimension_options(cube)
+    ])
+
+    # Bootstrap tanpa batas waktu agar yang diukur adalah biaya penuh jumlah resample bawaan
+    run('bootstrap_intervals', lambda: [
+        crosstab_intervals(cube, dims, likert_pivot_columns(cube, category), time_budget=None)
+        for category in LIKERT_PIVOT_PATTERNS for dims in pivot_dimension_options(cube)
+    ], stage_repeat=1)
+
+    stats = run('stream_csv', lambda: stream_survey_csv(csv_path, chunksize), stage_repeat=1)
+    if charts:
+        report = build_report(stats)
+        run('charts', lambda: [render_png(item.draw, item.figsize) for item in report.values() if item.draw],
+            stage_repeat=1)
+
+    os.remove(csv_path)
+    return results
+
+
+def compare_with_baseline(results, baseline_path, threshold=REGRESSION_THRESHOLD):
+    """Daftar tahap yang melambat lebih dari `threshold` kali dibanding baseline."""
+    with open(baseline_path) as handle:
+        baseline = {(r['rows'], r['stage']): r for r in json.load(handle)['results']}
+    regressions = []
+    for result in results:
+        previous = baseline.get((result['rows'], result['stage']))
+        if previous and previous['seconds'] > 0 and result['seconds'] / previous['seconds'] > threshold:
+            regressions.append({**result, 'baseline_seconds': previous['seconds'],
+                                'ratio': round(result['seconds'] / previous['seconds'], 3)})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skala tahap-tahap dashboard survei.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000],
+                        help="Jumlah responden yang diuji.")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--brands', type=int, default=40, help="Kardinalitas merek pada Q1-Q3.")
+    parser.add_argument('--chunksize', type=int, default=survey_engine.STREAM_CHUNKSIZE)
+    parser.add_argument('--repeat', type=int, default=3, help="Pengulangan per tahap (diambil yang tercepat).")
+    parser.add_argument('--no-memory', action='store_true', help="Lewati pengukuran memori (tracemalloc).")
+    parser.add_argument('--no-charts', action='store_true', help="Lewati tahap render grafik.")
+    parser.add_argument('--output', default='-', help="File JSON hasil ('-' untuk stdout).")
+    parser.add_argument('--baseline', help="JSON hasil sebelumnya; keluar dengan kode 1 jika ada regresi.")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        survey_engine.INGEST_CACHE_DIR = os.path.join(work_dir, 'ingest_cache')
+        os.makedirs(survey_engine.INGEST_CACHE_DIR)
+        for n_rows in args.sizes:
+            results += benchmark_size(
+                n_rows, work_dir, args.seed, args.brands, args.chunksize,
+                args.repeat, not args.no_memory, not args.no_charts
+            )
+
+    output = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'seed': args.seed,
+            'brands': args.brands,
+            'chunksize': args.chunksize,
+        },
+        'results': results,
+    }
+    exit_code = 0
+    if args.baseline:
+        output['regressions'] = compare_with_baseline(results, args.baseline)
+        for regression in output['regressions']:
+            print(f"REGRESI {regression['rows']} {regression['stage']}: "
+                  f"{regression['baseline_seconds']}s -> {regression['seconds']}s", file=sys.stderr)
+        exit_code = 1 if output['regressions'] else 0
+
+    text = json.dumps(output, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w') as handle:
+            handle.write(text + '\n')
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
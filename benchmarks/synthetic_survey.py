@@ -0,0 +1,70 @@
+# ==============================================================================
+# Generator Survei Sintetis
+# Data acak ber-seed dengan skema yang sama seperti data demo (S1-S3, Q1-Q28),
+# untuk mengukur perilaku dashboard pada ratusan ribu hingga jutaan responden.
+# ==============================================================================
+
+import numpy as np
+import pandas as pd
+
+from survey_engine import demo_survey
+
+DEMOGRAPHICS = {
+    'S1': ['Laki-laki', 'Perempuan'],
+    'S2': ['20 - 24 tahun', '25 - 29 tahun', '30 - 34 tahun', '35 - 39 tahun', '40 - 44 tahun', '45 - 49 tahun'],
+    'S3': ['Belum menikah', 'Menikah - belum punya anak', 'Menikah - punya anak', 'Cerai'],
+}
+KNOWN_BRANDS = [
+    'KFC', 'McD', 'HokBen', 'Pizza Hut', 'Burger King', 'Solaria', 'Sate Khas Senayan',
+    'A&W', 'Richeese Factory', 'Wendy\'s', 'Domino\'s Pizza', 'CFC', 'Texas Chicken',
+]
+LIKERT_SCALES = {
+    'setuju': ['Sangat Tidak Setuju', 'Tidak Setuju', 'Netral', 'Setuju', 'Sangat Setuju'],
+    'penting': ['Sangat Tidak Penting', 'Tidak Penting', 'Netral', 'Penting', 'Sangat Penting'],
+    'puas': ['Sangat Tidak Puas', 'Tidak Puas', 'Netral', 'Puas', 'Sangat Puas'],
+}
+
+# Tingkat jawaban kosong per kelompok kolom, kira-kira seperti ekspor survei sungguhan
+NAN_RATES = {'demographic': 0.01, 'top_of_mind': 0.02, 'unaided': 0.45, 'total': 0.30, 'likert': 0.05}
+
+
+def _likert_scale(col):
+    question = int(col[1:].split('_')[0])
+    if 16 <= question <= 19:
+        return LIKERT_SCALES['penting']
+    if 20 <= question <= 24:
+        return LIKERT_SCALES['puas']
+    return LIKERT_SCALES['setuju']
+
+
+def _column_spec(col, brands):
+    """(pilihan jawaban, bobot, tingkat kosong) untuk satu kolom."""
+    if col in DEMOGRAPHICS:
+        return DEMOGRAPHICS[col], None, NAN_RATES['demographic']
+    if col == 'Q23':
+        return [1, 2, 3, 4, 5], None, NAN_RATES['likert']
+    if col.startswith(('Q1_', 'Q2_', 'Q3_')):
+        # Popularitas merek mengikuti distribusi Zipf: beberapa merek besar, ekor panjang
+        weights = 1.0 / np.arange(1, len(brands) + 1)
+        rate = {'Q1_': 'top_of_mind', 'Q2_': 'unaided', 'Q3_': 'total'}[col[:3]]
+        return brands, weights / weights.sum(), NAN_RATES[rate]
+    # Jawaban Likert condong ke arah positif
+    return _likert_scale(col), np.array([0.05, 0.10, 0.25, 0.35, 0.25]), NAN_RATES['likert']
+
+
+def make_synthetic_survey(n_rows, seed=0, n_brands=40):
+    """
+    Survei sintetis `n_rows` responden dengan kolom yang sama seperti data demo.
+    `n_brands` mengatur kardinalitas merek pada pertanyaan awareness (Q1-Q3).
+    """
+    rng = np.random.default_rng(seed)
+    brands = (KNOWN_BRANDS + [f'Restoran {i}' for i in range(len(KNOWN_BRANDS), n_brands)])[:n_brands]
+
+    data = {}
+    for col in demo_survey().columns:
+        options, weights, nan_rate = _column_spec(col, brands)
+        codes = rng.choice(len(options), size=n_rows, p=weights)
+        values = np.asarray(options, dtype=object)[codes]
+        values[rng.random(n_rows) < nan_rate] = np.nan
+        data[col] = values
+    return pd.DataFrame(data)
@@ -0,0 +1,108 @@
+# ==============================================================================
+# CLI Batch Analisis Survei
+# Memproses satu direktori file survei (CSV/XLSX) secara paralel dan menulis
+# tabel frekuensi/Likert/tabel silang beserta grafiknya ke disk.
+#
+# Contoh:
+#   python survey_cli.py data/gelombang_3 --output-dir hasil/gelombang_3 --workers 8
+# ==============================================================================
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from survey_engine import (
+    STREAM_CHUNKSIZE, build_report, load_brand_normalizer, load_survey_file, render_png, stream_survey_csv,
+)
+
+SURVEY_EXTENSIONS = ('.csv', '.xls', '.xlsx')
+
+
+def find_survey_files(input_dir):
+    """Daftar file survei di `input_dir` (tidak rekursif), terurut berdasarkan nama."""
+    return sorted(
+        os.path.join(input_dir, name) for name in os.listdir(input_dir)
+        if name.endswith(SURVEY_EXTENSIONS) and not name.startswith('~$')
+    )
+
+
+def process_survey_file(path, output_dir, charts=True, dpi=200, chunksize=None, sheet_name=None,
+                        normalize_brands=True):
+    """
+    Menganalisis satu file dan menulis hasilnya ke `output_dir/<nama file>/`. Jika `chunksize`
+    diisi, file CSV diagregasi per potongan (streaming) alih-alih dimuat utuh ke memori.
+    `sheet_name` memilih sheet untuk file Excel (default sheet pertama). Dengan `normalize_brands`
+    ejaan merek digabung ke nama bakunya memakai pemetaan tersimpan bersama (BRAND_MAP_PATH).
+    Dijalankan di proses pekerja; mengembalikan (path, jumlah responden, jumlah file ditulis).
+    """
+    normalizer = load_brand_normalizer() if normalize_brands else None
+    if chunksize and path.endswith('.csv'):
+        source = stream_survey_csv(path, chunksize, normalizer)
+    else:
+        source = load_survey_file(path, None if path.endswith('.csv') else sheet_name)
+    target_dir = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0])
+    os.makedirs(target_dir, exist_ok=True)
+
+    written = 0
+    for name, item in build_report(source, normalizer).items():
+        if item.table is not None:
+            # Indeks hanya bermakna untuk tabel Likert/tabel silang (nama pertanyaan)
+            keep_index = not isinstance(item.table.index, pd.RangeIndex)
+            item.table.to_csv(os.path.join(target_dir, f'{name}.csv'), index=keep_index)
+            written += 1
+        if charts and item.draw is not None:
+            with open(os.path.join(target_dir, f'{name}.png'), 'wb') as handle:
+                handle.write(render_png(item.draw, item.figsize, dpi=dpi))
+            written += 1
+    return path, len(source), written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisis batch file survei restoran.")
+    parser.add_argument('input_dir', help="Direktori berisi file survei CSV/XLSX.")
+    parser.add_argument('-o', '--output-dir', default='hasil_analisis', help="Direktori keluaran.")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count(),
+                        help="Jumlah proses pekerja (default: jumlah core).")
+    parser.add_argument('--no-charts', action='store_true', help="Hanya tulis tabel, tanpa grafik PNG.")
+    parser.add_argument('--dpi', type=int, default=200, help="Resolusi grafik PNG.")
+    parser.add_argument('--stream', action='store_true',
+                        help="Agregasi CSV per potongan untuk file yang lebih besar dari RAM.")
+    parser.add_argument('--chunksize', type=int, default=STREAM_CHUNKSIZE,
+                        help=f"Baris per potongan pada mode --stream (default: {STREAM_CHUNKSIZE}).")
+    parser.add_argument('--sheet', help="Nama sheet yang dibaca dari file Excel (default: sheet pertama).")
+    parser.add_argument('--raw-brands', action='store_true',
+                        help="Hitung nama merek apa adanya, tanpa normalisasi alias/fuzzy.")
+    args = parser.parse_args(argv)
+
+    paths = find_survey_files(args.input_dir)
+    if not paths:
+        print(f"Tidak ada file survei di {args.input_dir}.", file=sys.stderr)
+        return 1
+
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(
+                process_survey_file, path, args.output_dir, not args.no_charts, args.dpi,
+                args.chunksize if args.stream else None, args.sheet, not args.raw_brands
+            ): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                path, n_rows, written = future.result()
+            except Exception as e:
+                failures += 1
+                print(f"GAGAL  {futures[future]}: {e}", file=sys.stderr)
+            else:
+                print(f"OK     {path}: {n_rows} responden, {written} file")
+
+    print(f"Selesai: {len(paths) - failures} berhasil, {failures} gagal.")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
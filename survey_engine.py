@@ -0,0 +1,1598 @@
+# ==============================================================================
+# Mesin Analisis Survei Restoran
+# Perhitungan tanpa Streamlit: dipakai bersama oleh dashboard (testter.py) dan CLI batch
+# ==============================================================================
+
+import difflib
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter, OrderedDict, namedtuple
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import seaborn as sns
+from matplotlib.figure import Figure
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as pa_ipc
+except ImportError:  # pyarrow opsional: tanpa pyarrow file selalu di-parse ulang
+    pa = None
+    pa_ipc = None
+
+# DatasetStore membagikan tampilan dangkal (tanpa salinan) dari DataFrame bersama. Dengan
+# Copy-on-Write (bawaan sejak pandas 3) penulisan ke tampilan menyalin kolomnya lebih dulu,
+# sehingga data milik sesi lain tidak pernah ikut berubah.
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
+try:
+    import plotly.graph_objects as go
+except ImportError:  # plotly opsional: tanpa plotly grafik selalu dirender sebagai PNG
+    go = None
+
+try:
+    import openpyxl
+except ImportError:  # openpyxl opsional: tanpa openpyxl Excel dibaca lewat pd.read_excel
+    openpyxl = None
+
+
+class UnsupportedFileType(ValueError):
+    """Ekstensi file survei tidak dikenali (hanya CSV dan Excel)."""
+
+
+# --- 1. Pemuatan Data ---
+# Cache ingest: setiap file yang diunggah dikonversi sekali menjadi snapshot Arrow IPC
+# (kolumnar, bertipe) dengan nama berdasarkan hash isi file dan versi format. Snapshot dibaca lewat
+# memory-map sehingga restart proses, worker lain, dan sesi baru tidak perlu mem-parse ulang.
+INGEST_CACHE_DIR = os.environ.get(
+    "SURVEY_INGEST_CACHE_DIR", os.path.join(tempfile.gettempdir(), "survey_ingest_cache")
+)
+INGEST_CACHE_MAX_BYTES = int(os.environ.get("SURVEY_INGEST_CACHE_MAX_MB", "2048")) * 1024 * 1024
+# Versi format snapshot, ikut dalam nama file. Naikkan setiap kali jalur parse berubah (kolom yang
+# dibaca, skema tipe, pembaca Excel) agar snapshot lama tidak disajikan dengan hasil parse lama.
+# 2: Excel hanya kolom S*/Q* dengan tipe dari SURVEY_SCHEMA.
+# 3: baris kosong di tengah sheet Excel tidak lagi dibuang.
+SNAPSHOT_VERSION = 3
+
+
+def content_digest(raw_bytes, sheet_name=None):
+    """Hash isi file (dan sheet Excel yang dipilih) yang menjadi kunci snapshot."""
+    digest = hashlib.blake2b(raw_bytes, digest_size=20)
+    if sheet_name is not None:
+        digest.update(b'\0sheet:' + str(sheet_name).encode())
+    return digest.hexdigest()
+
+
+def _snapshot_path(digest):
+    return os.path.join(INGEST_CACHE_DIR, f"{digest}.v{SNAPSHOT_VERSION}.arrow")
+
+
+def _arrow_compatible(df):
+    """Mengubah kolom object bertipe campuran menjadi string agar bisa disimpan di Arrow."""
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True).startswith('mixed'):
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+def _read_snapshot(digest):
+    """Membaca snapshot (memory-mapped) bila ada; None jika belum tersedia."""
+    if pa is None:
+        return None
+    path = _snapshot_path(digest)
+    if not os.path.exists(path):
+        return None
+    try:
+        table = pa_ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        os.utime(path)  # tandai baru dipakai untuk kebijakan LRU
+    except (OSError, pa.ArrowException):
+        # Snapshot rusak/terpotong: buang dan parse ulang dari file asli
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return table.to_pandas()
+
+
+def _write_snapshot(digest, df):
+    """Menyimpan snapshot secara atomik. Kegagalan tidak menggagalkan pemuatan data."""
+    if pa is None:
+        return
+    path = _snapshot_path(digest)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(INGEST_CACHE_DIR, exist_ok=True)
+        table = pa.Table.from_pandas(_arrow_compatible(df), preserve_index=False)
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa_ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except (OSError, pa.ArrowException):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    _evict_snapshots(keep=path)
+
+
+def _evict_snapshots(keep=None, max_bytes=INGEST_CACHE_MAX_BYTES):
+    """
+    Menghapus snapshot versi format lain, lalu snapshot yang paling lama tidak dipakai sampai
+    total ukuran di bawah batas.
+    """
+    entries = []
+    for name in os.listdir(INGEST_CACHE_DIR):
+        if not name.endswith('.arrow'):
+            continue
+        path = os.path.join(INGEST_CACHE_DIR, name)
+        if not name.endswith(f'.v{SNAPSHOT_VERSION}.arrow'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# Hanya kolom skrining (S*) dan pertanyaan (Q*) yang dipakai dashboard
+SURVEY_COL_PATTERN = re.compile(r'^[SQ]\d+')
+
+# Skema survei: tipe kolom ditentukan dari nama kolom, bukan ditebak dari isinya. Jawaban teks
+# menjadi categorical (kode int8 + label unik sekali saja); jawaban angka menjadi Int8.
+SURVEY_SCHEMA = [
+    ('demographic', re.compile(r'^S\d+$')),
+    ('brand', re.compile(r'^Q[1-3]_\d+$')),
+    ('likert', re.compile(r'^Q(1[5-9]|2[0-8])(_\d+)?$')),
+]
+
+
+def survey_column_kind(col):
+    """'demographic', 'brand', 'likert', atau None untuk kolom di luar skema."""
+    for kind, pattern in SURVEY_SCHEMA:
+        if pattern.match(col):
+            return kind
+    return None
+
+
+def _typed_column(col, uniques, codes):
+    """
+    Membentuk kolom dari nilai unik dan kodenya (-1 = kosong) sesuai skema: teks -> categorical,
+    bilangan bulat kecil -> Int8. Kolom di luar skema dibiarkan ditebak seperti biasa.
+    """
+    kind = survey_column_kind(col)
+    numeric = bool(uniques) and all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in uniques)
+    if kind is None or (numeric and not all(float(value).is_integer() and -128 <= value <= 127 for value in uniques)):
+        lookup = np.array(list(uniques) + [None], dtype=object)
+        return pd.Series(lookup[codes], name=col).infer_objects()
+    if numeric:
+        lookup = np.array(list(uniques) + [np.nan], dtype=float)
+        return pd.Series(lookup[codes], name=col).astype('Int8')
+
+    # Label campuran (mis. angka dan teks) disatukan sebagai teks; kategori diurutkan
+    labels = [value if isinstance(value, str) else str(value) for value in uniques]
+    categories = sorted(set(labels))
+    position = {label: i for i, label in enumerate(categories)}
+    remap = np.array([position[label] for label in labels] + [-1], dtype=np.intp)
+    return pd.Series(pd.Categorical.from_codes(remap[codes], categories), name=col)
+
+
+def apply_survey_schema(df):
+    """Menerapkan skema survei pada DataFrame yang sudah dimuat (mis. hasil pd.read_excel)."""
+    columns = {}
+    for col in df.columns:
+        codes, uniques = pd.factorize(df[col])
+        columns[col] = _typed_column(str(col), list(uniques), codes)
+    return pd.DataFrame(columns, index=df.index)
+
+
+def excel_sheet_names(raw_bytes):
+    """Nama sheet dalam workbook tanpa memuat isi sheet mana pun."""
+    if openpyxl is None:
+        return pd.ExcelFile(io.BytesIO(raw_bytes)).sheet_names
+    workbook = openpyxl.load_workbook(io.BytesIO(raw_bytes), read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+def read_survey_excel(source, sheet_name=None):
+    """
+    Membaca satu sheet .xlsx baris demi baris (openpyxl read-only) dan hanya menyimpan kolom S*/Q*.
+    Setiap sel langsung dikodekan ke indeks nilai unik kolomnya, sehingga memori sebanding dengan
+    jumlah sel x 4 byte, bukan objek Python per sel. Sheet lain tidak pernah di-parse.
+    Seperti pd.read_excel, baris kosong di tengah tetap menjadi responden (semua jawaban NaN);
+    hanya baris kosong di akhir sheet yang dibuang.
+    """
+    if openpyxl is None:
+        df = pd.read_excel(
+            source, sheet_name=0 if sheet_name is None else sheet_name,
+            usecols=lambda col: bool(SURVEY_COL_PATTERN.match(str(col)))
+        )
+        return apply_survey_schema(df)
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0] if sheet_name is None else workbook[sheet_name]
+        header = next(sheet.iter_rows(max_row=1, values_only=True), ())
+        wanted = [
+            (i, str(name).strip()) for i, name in enumerate(header)
+            if name is not None and SURVEY_COL_PATTERN.match(str(name).strip())
+        ]
+        encoders = [{} for _ in wanted]
+        codes = [array('i') for _ in wanted]
+        # Kolom setelah kolom survei terakhir tidak perlu dibentuk sama sekali
+        last_col = max((i for i, _ in wanted), default=-1) + 1
+        rows = sheet.iter_rows(min_row=2, max_col=last_col, values_only=True) if wanted else ()
+        blank_rows = 0  # baris kosong yang belum tentu berada di akhir sheet
+        for row in rows:
+            values = [row[i] if i < len(row) else None for i, _ in wanted]
+            if all(value is None or value == '' for value in values):
+                blank_rows += 1
+                continue
+            if blank_rows:
+                for column_codes in codes:
+                    column_codes.extend([-1] * blank_rows)
+                blank_rows = 0
+            for value, encoder, column_codes in zip(values, encoders, codes):
+                if value is None or value == '':
+                    column_codes.append(-1)
+                else:
+                    column_codes.append(encoder.setdefault(value, len(encoder)))
+    finally:
+        workbook.close()
+
+    return pd.DataFrame({
+        col: _typed_column(col, list(encoder), np.frombuffer(column_codes, dtype=np.intc))
+        for (_, col), encoder, column_codes in zip(wanted, encoders, codes)
+    })
+
+
+def dataset_digest(raw_bytes, name, sheet_name=None):
+    """ID dataset untuk isi file; sheet hanya ikut dihitung untuk Excel."""
+    return content_digest(raw_bytes, None if name.endswith('.csv') else sheet_name)
+
+
+def load_survey_bytes(raw_bytes, name, sheet_name=None, digest=None):
+    """
+    Memuat survei dari isi file (CSV/Excel). File yang sama (berdasarkan hash isi dan sheet)
+    dibaca dari snapshot kolumnar jika tersedia. ID dataset disimpan di `df.attrs`.
+    `sheet_name` hanya berlaku untuk Excel; default sheet pertama. `digest` boleh diisi bila
+    dataset_digest() sudah dihitung pemanggil, agar isi file tidak di-hash dua kali.
+    """
+    if not name.endswith(('.csv', '.xls', '.xlsx')):
+        raise UnsupportedFileType("Tipe file tidak didukung. Unggah file CSV atau Excel.")
+
+    is_csv = name.endswith('.csv')
+    if digest is None:
+        digest = dataset_digest(raw_bytes, name, sheet_name)
+    df = _read_snapshot(digest)
+    if df is None:
+        if is_csv:
+            df = pd.read_csv(io.BytesIO(raw_bytes))
+        elif name.endswith('.xlsx'):
+            df = read_survey_excel(io.BytesIO(raw_bytes), sheet_name)
+        else:
+            # .xls lama tidak didukung openpyxl
+            df = apply_survey_schema(pd.read_excel(
+                io.BytesIO(raw_bytes), sheet_name=0 if sheet_name is None else sheet_name,
+                usecols=lambda col: bool(SURVEY_COL_PATTERN.match(str(col)))
+            ))
+        _write_snapshot(digest, df)
+    df.attrs['dataset_id'] = digest
+    return df
+
+
+def load_survey_file(path, sheet_name=None):
+    """Memuat survei dari path file di disk."""
+    with open(path, 'rb') as handle:
+        return load_survey_bytes(handle.read(), os.path.basename(path), sheet_name)
+
+
+# Penyimpanan dataset bersama: satu DataFrame per ID dataset (hash isi) untuk seluruh proses,
+# dibatasi total byte dengan penggusuran LRU. Setiap pemanggil menerima tampilan read-only.
+DATASET_STORE_MAX_BYTES = int(os.environ.get("SURVEY_DATASET_STORE_MB", "2048")) * 1024 * 1024
+
+
+class DatasetStore:
+    """
+    DataFrame bersama antar sesi, dideduplikasi berdasarkan ID dataset. Pemuatan file yang sama
+    secara bersamaan hanya dijalankan sekali; pemanggil lain menunggu hasilnya.
+    Dataset yang digusur tetap hidup selama masih dipegang sesi yang memakainya.
+    """
+
+    def __init__(self, max_bytes=DATASET_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._frames = OrderedDict()  # ID dataset -> (DataFrame, ukuran byte)
+        self._loading = {}            # ID dataset -> Lock selama pemuatan berlangsung
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._frames
+
+    def _lookup(self, key):
+        entry = self._frames.get(key)
+        if entry is None:
+            return None
+        self._frames.move_to_end(key)
+        self.hits += 1
+        return entry[0].copy(deep=False)
+
+    def get_or_load(self, key, loader):
+        """Tampilan read-only dataset `key`; `loader()` hanya dipanggil jika belum tersimpan."""
+        with self._lock:
+            view = self._lookup(key)
+            if view is not None:
+                return view
+            key_lock = self._loading.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                view = self._lookup(key)
+                if view is not None:
+                    return view
+            try:
+                df = loader()
+                self.put(key, df)
+            finally:
+                with self._lock:
+                    self._loading.pop(key, None)
+            return df.copy(deep=False)
+
+    def put(self, key, df):
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            self.misses += 1
+            if key in self._frames:
+                self.size -= self._frames.pop(key)[1]
+            self._frames[key] = (df, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes and len(self._frames) > 1:
+                _, (_, evicted) = self._frames.popitem(last=False)
+                self.size -= evicted
+                self.evictions += 1
+
+    def occupancy(self):
+        """Ringkasan isi penyimpanan untuk pemantauan."""
+        with self._lock:
+            return {
+                'datasets': len(self._frames), 'bytes': self.size, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'entries': [
+                    {'dataset_id': key, 'rows': len(df), 'bytes': nbytes}
+                    for key, (df, nbytes) in reversed(self._frames.items())
+                ],
+            }
+
+
+def demo_survey():
+    """Data demo 100 responden dengan skema survei lengkap."""
+    # Data demo yang lebih bervariasi agar visualisasi menarik
+    cols = ['S1', 'S2', 'S3', 'Q1_1', 'Q2_1', 'Q2_2', 'Q2_3', 'Q3_1', 'Q3_2', 'Q3_3', 'Q3_4', 'Q3_5', 
+            'Q15_1', 'Q15_2', 'Q15_3', 'Q15_4', 'Q15_5', 'Q15_6', 'Q15_7', 'Q15_8', 
+            'Q16_1', 'Q16_2', 'Q16_3', 'Q16_4', 'Q17_1', 'Q17_2', 'Q17_3', 'Q18', 
+            'Q19_1', 'Q19_2', 'Q19_3', 'Q19_4', 'Q19_5', 
+            'Q20_1', 'Q20_2', 'Q20_3', 'Q20_4', 'Q21_1', 'Q21_2', 'Q21_3', 'Q23', 
+            'Q24_1', 'Q24_2', 'Q24_3', 'Q24_4', 'Q24_5',
+            'Q25_1', 'Q25_2', 'Q26_1', 'Q26_2', 'Q26_3', 'Q26_4', 'Q27_1', 'Q27_2', 'Q27_3', 'Q28_1', 'Q28_2']
+
+    data = {
+        'S1': ['Laki-laki', 'Perempuan'] * 50,
+        'S2': ['45 - 49 tahun', '25 - 29 tahun', '30 - 34 tahun', '20 - 24 tahun', '40 - 44 tahun'] * 20,
+        'S3': ['Menikah - punya anak', 'Belum menikah'] * 50,
+        'Q1_1': ['KFC', 'McD', 'HokBen', 'KFC', 'Pizza Hut'] * 20,
+        'Q2_1': ['Burger King', np.nan, 'Burger King', np.nan, 'Burger King'] * 20,
+        'Q2_2': ['Solaria', 'Solaria', np.nan, 'Solaria', np.nan] * 20,
+        'Q2_3': [np.nan, 'Sate Khas Senayan', 'Sate Khas Senayan', np.nan, 'Sate Khas Senayan'] * 20,
+        'Q3_1': ['KFC'] * 100,
+        'Q3_2': ['McD'] * 100,
+        'Q3_3': ['Pizza Hut'] * 100,
+        'Q3_4': ['HokBen'] * 100,
+        'Q3_5': ['Solaria'] * 100,
+        'Q15_1': ['Sangat Setuju', 'Setuju', 'Sangat Setuju', 'Netral', 'Setuju'] * 20,
+        'Q15_2': ['Setuju', 'Sangat Tidak Setuju', 'Netral', 'Setuju', 'Tidak Setuju'] * 20,
+        'Q15_3': ['Sangat Setuju', 'Sangat Setuju', 'Netral', 'Sangat Setuju', 'Netral'] * 20,
+        'Q15_4': ['Setuju', 'Netral', 'Sangat Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
+        'Q15_5': ['Setuju', 'Tidak Setuju', 'Netral', 'Setuju', 'Setuju'] * 20,
+        'Q15_6': ['Sangat Setuju', 'Setuju', 'Sangat Tidak Setuju', 'Setuju', 'Netral'] * 20,
+        'Q15_7': ['Setuju', 'Sangat Setuju', 'Setuju', 'Tidak Setuju', 'Sangat Setuju'] * 20,
+        'Q15_8': ['Tidak Setuju', 'Netral', 'Sangat Setuju', 'Tidak Setuju', 'Netral'] * 20,
+        'Q16_1': ['Sangat Penting', 'Penting', 'Sangat Penting', 'Netral', 'Penting'] * 20,
+        'Q16_2': ['Penting', 'Sangat Tidak Penting', 'Netral', 'Penting', 'Tidak Penting'] * 20,
+        'Q16_3': ['Sangat Penting', 'Sangat Penting', 'Netral', 'Sangat Penting', 'Netral'] * 20,
+        'Q16_4': ['Penting', 'Netral', 'Sangat Penting', 'Penting', 'Sangat Tidak Penting'] * 20,
+        'Q17_1': ['Sangat Penting', 'Tidak Penting', 'Netral', 'Sangat Penting', 'Penting'] * 20,
+        'Q17_2': ['Penting', 'Sangat Penting', 'Penting', 'Tidak Penting', 'Sangat Penting'] * 20,
+        'Q17_3': ['Sangat Tidak Penting', 'Netral', 'Sangat Penting', 'Tidak Penting', 'Netral'] * 20,
+        'Q18': ['Sangat Penting', 'Penting', 'Netral', 'Tidak Penting', 'Sangat Tidak Penting'] * 20,
+        'Q19_1': ['Sangat Penting', 'Penting', 'Sangat Penting', 'Netral', 'Penting'] * 20,
+        'Q19_2': ['Penting', 'Sangat Tidak Penting', 'Netral', 'Penting', 'Tidak Penting'] * 20,
+        'Q19_3': ['Sangat Penting', 'Sangat Penting', 'Netral', 'Sangat Penting', 'Netral'] * 20,
+        'Q19_4': ['Penting', 'Netral', 'Sangat Penting', 'Penting', 'Sangat Tidak Penting'] * 20,
+        'Q19_5': ['Sangat Penting', 'Tidak Penting', 'Netral', 'Sangat Penting', 'Penting'] * 20,
+        'Q20_1': ['Sangat Puas', 'Puas', 'Netral', 'Puas', 'Sangat Tidak Puas'] * 20,
+        'Q20_2': ['Puas', 'Tidak Puas', 'Sangat Puas', 'Puas', 'Netral'] * 20,
+        'Q20_3': ['Sangat Puas', 'Netral', 'Tidak Puas', 'Sangat Puas', 'Netral'] * 20,
+        'Q20_4': ['Tidak Puas', 'Netral', 'Sangat Puas', 'Tidak Puas', 'Netral'] * 20,
+        'Q21_1': ['Puas', 'Sangat Puas', 'Puas', 'Tidak Puas', 'Sangat Puas'] * 20,
+        'Q21_2': ['Sangat Tidak Puas', 'Tidak Puas', 'Sangat Puas', 'Tidak Puas', 'Netral'] * 20,
+        'Q21_3': ['Sangat Puas', 'Puas', 'Netral', 'Sangat Puas', 'Puas'] * 20,
+        'Q23': [1, 2, 3, 4, 5] * 20,
+        'Q24_1': ['Sangat Puas', 'Puas', 'Netral', 'Tidak Puas', 'Sangat Tidak Puas'] * 20,
+        'Q24_2': ['Sangat Puas', 'Netral', 'Sangat Tidak Puas', 'Puas', 'Netral'] * 20,
+        'Q24_3': ['Puas', 'Sangat Puas', 'Puas', 'Sangat Tidak Puas', 'Tidak Puas'] * 20,
+        'Q24_4': ['Netral', 'Tidak Puas', 'Sangat Puas', 'Netral', 'Sangat Puas'] * 20,
+        'Q24_5': ['Puas', 'Netral', 'Puas', 'Tidak Puas', 'Sangat Tidak Puas'] * 20,
+        'Q25_1': ['Sangat Setuju', 'Netral', 'Setuju', 'Sangat Setuju', 'Netral'] * 20,
+        'Q25_2': ['Setuju', 'Sangat Setuju', 'Netral', 'Sangat Tidak Setuju', 'Setuju'] * 20,
+        'Q26_1': ['Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
+        'Q26_2': ['Setuju', 'Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju'] * 20,
+        'Q26_3': ['Sangat Setuju', 'Netral', 'Setuju', 'Sangat Setuju', 'Netral'] * 20,
+        'Q26_4': ['Setuju', 'Setuju', 'Sangat Setuju', 'Netral', 'Setuju'] * 20,
+        'Q27_1': ['Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
+        'Q27_2': ['Sangat Setuju', 'Netral', 'Setuju', 'Sangat Setuju', 'Netral'] * 20,
+        'Q27_3': ['Setuju', 'Sangat Setuju', 'Netral', 'Sangat Tidak Setuju', 'Setuju'] * 20,
+        'Q28_1': ['Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
+        'Q28_2': ['Setuju', 'Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju'] * 20,
+    }
+
+    df = pd.DataFrame(data)
+    # Menambahkan kolom kosong agar sesuai dengan template awal
+    for col in cols:
+        if col not in df.columns:
+            df[col] = np.nan
+
+    df = df[cols]
+    df.attrs['dataset_id'] = 'demo'
+    return df
+
+
+# --- 2. Multi-respon ---
+# Kolom multi-respon berformat Q<nomor>_<sub-item>; dicocokkan eksak agar 'Q1' tidak ikut Q15_*.
+QUESTION_COL_PATTERN = re.compile(r'^(Q\d+)_(\d+)$')
+MULTI_RESPONSE_COLUMNS = ['Restoran', 'Frekuensi', 'Responden']
+
+
+def build_question_index(columns):
+    """Memetakan setiap pertanyaan ke kolom sub-itemnya (mis. 'Q2' -> ['Q2_1', 'Q2_2', ...])."""
+    index = {}
+    for col in columns:
+        match = QUESTION_COL_PATTERN.match(str(col))
+        if match:
+            index.setdefault(match.group(1), []).append((int(match.group(2)), col))
+    return {question: [col for _, col in sorted(items)] for question, items in index.items()}
+
+
+def multi_response_groups(columns):
+    """Kolom untuk tiap tabel multi-respon: top of mind, unaided (Q1_1 + Q2_*) dan total (Q3_*)."""
+    question_index = build_question_index(columns)
+    top_of_mind = ['Q1_1'] if 'Q1_1' in columns else []
+    return {
+        'top_of_mind': top_of_mind,
+        'unaided_awareness': top_of_mind + question_index.get('Q2', []),
+        'total_awareness': question_index.get('Q3', []),
+    }
+
+
+# Normalisasi nama merek: ejaan bebas ("McD", "McDonald's", "mcd ") dipetakan ke satu nama baku
+# lewat kamus alias lalu pencocokan fuzzy. Pemetaan dihitung per ejaan unik (bukan per sel) dan
+# disimpan di file JSON, sehingga ejaan yang sudah pernah dilihat tidak dicocokkan ulang, juga
+# antar proses dan sesi. Alias tambahan dapat diberikan lewat file JSON {nama baku: [alias, ...]}.
+BRAND_ALIASES = {
+    'KFC': ['Kentucky Fried Chicken', 'Kentucky'],
+    'McD': ["McDonald's", 'McDonalds', 'Mc Donald', 'Mekdi', 'Mekdonal'],
+    'HokBen': ['Hoka Hoka Bento', 'Hoka-Hoka Bento'],
+    'Pizza Hut': ['PHD', 'Pizza Hut Delivery'],
+    'Burger King': ['BK'],
+    'Sate Khas Senayan': ['SKS'],
+    'A&W': ['A and W'],
+    'Richeese Factory': ['Richeese'],
+    "Wendy's": ['Wendys'],
+    "Domino's Pizza": ["Domino's", 'Dominos'],
+}
+BRAND_ALIASES_PATH = os.environ.get("SURVEY_BRAND_ALIASES")
+BRAND_MAP_PATH = os.environ.get(
+    "SURVEY_BRAND_MAP_PATH", os.path.join(os.path.expanduser("~"), ".survey_dashboard", "brand_map.json")
+)
+BRAND_FUZZY_CUTOFF = 0.85  # ejaan vs kosakata alias
+BRAND_MERGE_CUTOFF = 0.9   # antar merek tak dikenal dalam satu tabel; lebih ketat ('Bakmi GO' bukan 'Bakmi GM')
+
+
+def brand_key(text):
+    """Kunci pencocokan ejaan: huruf/angka Unicode huruf kecil tanpa aksen, spasi, dan tanda baca."""
+    text = unicodedata.normalize('NFKD', text).casefold()
+    return ''.join(char for char in text if char.isalnum())
+
+
+def _key_digits(key):
+    return ''.join(char for char in key if char.isdigit())
+
+
+def load_brand_aliases(path=BRAND_ALIASES_PATH):
+    """Kamus alias bawaan, ditambah/ditimpa isi file JSON `path` jika ada."""
+    aliases = {canonical: list(spellings) for canonical, spellings in BRAND_ALIASES.items()}
+    if path:
+        with open(path) as handle:
+            for canonical, spellings in json.load(handle).items():
+                aliases[canonical] = aliases.get(canonical, []) + list(spellings)
+    return aliases
+
+
+class _KeyIndex:
+    """
+    Kunci ejaan dikelompokkan per (karakter pertama, panjang). Rasio difflib >= `cutoff` hanya
+    mungkin bila panjang kedua kunci berdekatan, sehingga pencarian fuzzy hanya memeriksa
+    kelompok yang bisa lolos, bukan seluruh kosakata.
+    """
+
+    def __init__(self, cutoff):
+        self.cutoff = cutoff
+        self._buckets = {}
+
+    def add(self, key):
+        self._buckets.setdefault((key[0], len(key)), []).append(key)
+
+    def closest(self, key):
+        """Kunci terdekat dengan angka yang sama ('Restoran 15' bukan 'Restoran 16'), atau None."""
+        bound = self.cutoff / (2 - self.cutoff)
+        lengths = range(int(np.ceil(len(key) * bound)), int(len(key) / bound) + 1)
+        candidates = [candidate for n in lengths for candidate in self._buckets.get((key[0], n), ())]
+        digits = _key_digits(key)
+        for candidate in difflib.get_close_matches(key, candidates, n=3, cutoff=self.cutoff):
+            if _key_digits(candidate) == digits:
+                return candidate
+        return None
+
+
+class BrandNormalizer:
+    """
+    Normalisasi nama merek dalam dua tahap.
+
+    1. `brand_ids`: setiap ejaan dipetakan ke ID merek yang hanya bergantung pada ejaan itu dan
+       kamus alias: nama baku alias (kunci sama, atau fuzzy terhadap kosakata alias), atau kunci
+       ejaan untuk merek tak dikenal. Karena tidak bergantung pada data lain, hasilnya disimpan
+       di `path` dan dipakai bersama antar sesi dan proses. Hanya ejaan kosong yang menjadi None.
+    2. `display_names`: dalam satu tabel, merek tak dikenal diberi nama ejaan tersering dan salah
+       ketiknya digabung fuzzy ke merek yang lebih sering disebut. Tahap ini bergantung pada isi
+       tabel sehingga tidak pernah disimpan.
+    """
+
+    # Naikkan bila aturan pemetaan ejaan -> ID berubah agar pemetaan tersimpan yang lama tidak dipakai
+    MATCHER_VERSION = 3
+
+    def __init__(self, aliases=None, path=None, cutoff=BRAND_FUZZY_CUTOFF, merge_cutoff=BRAND_MERGE_CUTOFF):
+        aliases = BRAND_ALIASES if aliases is None else aliases
+        self.path = path
+        self.merge_cutoff = merge_cutoff
+        self.hits = 0
+        self.misses = 0
+        self._known = {}  # kunci ejaan -> nama baku dari kamus alias
+        for canonical, spellings in aliases.items():
+            for spelling in [canonical, *spellings]:
+                key = brand_key(spelling)
+                if key:
+                    self._known.setdefault(key, canonical)
+        self._canonical = set(self._known.values())
+        self._vocabulary = _KeyIndex(cutoff)
+        for key in self._known:
+            self._vocabulary.add(key)
+        # Pemetaan tersimpan dan statistik per ID hanya berlaku untuk kamus alias dan aturan yang sama
+        self.version = hashlib.sha256(
+            json.dumps([sorted(self._known.items()), cutoff, self.MATCHER_VERSION]).encode()
+        ).hexdigest()[:16]
+        self._ids = self._read_mapping() if path else {}  # ejaan -> ID merek
+        self._lock = threading.Lock()
+
+    def _read_mapping(self):
+        try:
+            with open(self.path) as handle:
+                stored = json.load(handle)
+        except (OSError, ValueError):
+            return {}
+        return stored.get('mapping', {}) if stored.get('version') == self.version else {}
+
+    def _match(self, spelling):
+        if not spelling.strip():
+            return None
+        key = brand_key(spelling)
+        if not key:
+            # Hanya tanda baca (mis. '-'): tetap dihitung apa adanya
+            return ' '.join(spelling.split())
+        if key in self._known:
+            return self._known[key]
+        candidate = self._vocabulary.closest(key)
+        return self._known[candidate] if candidate is not None else key
+
+    def brand_ids(self, spellings):
+        """ID merek untuk setiap ejaan (urutan sama); nilai non-teks dikembalikan apa adanya."""
+        ids = []
+        with self._lock:
+            new = False
+            for value in spellings:
+                if not isinstance(value, str):
+                    ids.append(value)
+                elif value in self._ids:
+                    self.hits += 1
+                    ids.append(self._ids[value])
+                else:
+                    self.misses += 1
+                    new = True
+                    self._ids[value] = self._match(value)
+                    ids.append(self._ids[value])
+            if new and self.path:
+                self._write_mapping()
+        return ids
+
+    def is_known(self, brand_id):
+        return brand_id in self._canonical
+
+    def display_names(self, ids, spellings, counts):
+        """
+        Nama tampilan untuk setiap ID (urutan sama). `spellings`/`counts` adalah ejaan mentah tiap
+        elemen beserta frekuensinya dalam tabel, untuk memilih nama merek tak dikenal.
+        """
+        # Ejaan tersering per ID merek tak dikenal (spasi dirapikan)
+        labels = {}
+        for brand_id, spelling, count in zip(ids, spellings, counts):
+            if brand_id is None or self.is_known(brand_id) or not isinstance(spelling, str):
+                continue
+            label_counts = labels.setdefault(brand_id, Counter())
+            label_counts[' '.join(spelling.split())] += count
+        totals = {brand_id: sum(label_counts.values()) for brand_id, label_counts in labels.items()}
+        best = {
+            brand_id: min(label_counts.items(), key=lambda item: (-item[1], item[0]))[0]
+            for brand_id, label_counts in labels.items()
+        }
+
+        # Salah ketik digabung ke merek tak dikenal yang lebih sering disebut
+        target, index = {}, _KeyIndex(self.merge_cutoff)
+        for brand_id in sorted(totals, key=lambda brand_id: (-totals[brand_id], brand_id)):
+            key = brand_key(brand_id)
+            closest = index.closest(key) if key else None
+            if closest is None:
+                target[brand_id] = brand_id
+                if key:
+                    index.add(key)
+            else:
+                target[brand_id] = closest
+
+        return [best[target[brand_id]] if brand_id in best else brand_id for brand_id in ids]
+
+    def normalize(self, spellings, counts=None):
+        """Nama baku untuk setiap ejaan (urutan sama): brand_ids lalu display_names."""
+        spellings = list(spellings)
+        counts = [1] * len(spellings) if counts is None else counts
+        return self.display_names(self.brand_ids(spellings), spellings, counts)
+
+    def _write_mapping(self):
+        """Menyimpan pemetaan secara atomik. Kegagalan tidak menggagalkan analisis (hanya cache)."""
+        # Digabung dengan isi file terkini agar ejaan yang ditulis proses lain tidak hilang
+        mapping = {**self._read_mapping(), **self._ids}
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(tmp_path, 'w') as handle:
+                json.dump({'version': self.version, 'mapping': mapping}, handle, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            # Pemetaan tetap berlaku di memori; ejaan baru dicocokkan ulang di proses berikutnya
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def __len__(self):
+        with self._lock:
+            return len(self._ids)
+
+
+def load_brand_normalizer(path=BRAND_MAP_PATH, aliases_path=BRAND_ALIASES_PATH):
+    """Normalizer dengan kamus alias bawaan (+ file alias) dan pemetaan tersimpan di `path`."""
+    return BrandNormalizer(load_brand_aliases(aliases_path), path)
+
+
+def _multi_response_codes(df, cols):
+    """Kode factorize 2-D (responden x kolom) dan nilai unik untuk kolom multi-respon."""
+    values = df[cols].to_numpy(dtype=object)
+    codes, uniques = pd.factorize(values.ravel())
+    return codes.reshape(values.shape), uniques
+
+
+def _relabel(codes, labels):
+    """Memetakan ulang kode ke `labels` (satu per nilai unik); label sama digabung, None menjadi kosong."""
+    remap, merged = pd.factorize(np.array(labels, dtype=object))
+    return np.append(remap, -1)[codes], merged  # kode -1 (kosong) jatuh ke elemen terakhir
+
+
+def _mentions_reach(codes, n_labels):
+    """Frekuensi sebutan dan jumlah responden yang menyebut (minimal sekali) per kode."""
+    mentions = np.bincount(codes[codes >= 0], minlength=n_labels)
+    # Jangkauan: urutkan kode per baris lalu hitung hanya kemunculan pertama di tiap baris
+    ordered = np.sort(codes, axis=1)
+    first = np.ones(ordered.shape, dtype=bool)
+    first[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    reach = np.bincount(ordered[first & (ordered >= 0)], minlength=n_labels)
+    return mentions, reach
+
+
+def count_multi_response(df, cols, normalizer=None):
+    """
+    Menghitung frekuensi sebutan dan jumlah responden yang menyebut (minimal sekali)
+    untuk sekumpulan kolom multi-respon dalam satu lintasan atas ndarray 2-D.
+    Dengan `normalizer` (BrandNormalizer) ejaan merek digabung ke nama bakunya; pemetaan hanya
+    dijalankan pada nilai unik, lalu kode factorize dipetakan ulang sebelum dihitung sehingga
+    responden yang menulis dua ejaan merek yang sama tetap dihitung sekali. Ejaan yang digabung
+    dicatat di `attrs['brand_variants']` (nama baku -> daftar ejaan).
+    """
+    if not cols:
+        return pd.DataFrame(columns=MULTI_RESPONSE_COLUMNS)
+
+    codes, uniques = _multi_response_codes(df, cols)
+    variants = {}
+    if normalizer is not None and len(uniques):
+        raw_mentions = np.bincount(codes[codes >= 0], minlength=len(uniques))
+        labels = normalizer.normalize(uniques, raw_mentions)
+        for spelling, label in zip(uniques, labels):
+            if label is not None and spelling != label:
+                variants.setdefault(label, []).append(spelling)
+        codes, uniques = _relabel(codes, labels)
+    mentions, reach = _mentions_reach(codes, len(uniques))
+
+    table = pd.DataFrame({'Restoran': uniques, 'Frekuensi': mentions, 'Responden': reach})
+    table = table.sort_values('Frekuensi', ascending=False, kind='stable').reset_index(drop=True)
+    if variants:
+        table.attrs['brand_variants'] = variants
+    return table
+
+
+def value_counts_table(df, col):
+    """Tabel frekuensi jawaban satu kolom (mis. brand image Q15_*)."""
+    freq_data = df[col].value_counts().reset_index()
+    freq_data.columns = ['Respons', 'Frekuensi']
+    return freq_data
+
+
+# --- 3. Skala Likert ---
+# Skor Likert. Matriks hasil encoding memakai int8 dengan 0 sebagai penanda jawaban kosong.
+LIKERT_MAPPING = {
+    'Sangat Tidak Setuju': 1, 'Tidak Setuju': 2, 'Netral': 3, 'Setuju': 4, 'Sangat Setuju': 5,
+    'Sangat Tidak Penting': 1, 'Tidak Penting': 2, 'Netral': 3, 'Penting': 4, 'Sangat Penting': 5,
+    'Sangat Tidak Puas': 1, 'Tidak Puas': 2, 'Netral': 3, 'Puas': 4, 'Sangat Puas': 5
+}
+LIKERT_MISSING = 0
+LIKERT_SCORES = np.arange(1, max(LIKERT_MAPPING.values()) + 1)
+LIKERT_COL_PATTERN = re.compile(r'Q(1[5-9]|2[0-8])_\d+')
+
+LikertMatrix = namedtuple('LikertMatrix', ['values', 'columns', 'index'])
+
+
+def encode_likert(df):
+    """
+    Mengubah semua kolom Likert (Q15-Q28) menjadi satu matriks int8 sekali saja.
+    Label dipetakan hanya pada nilai unik tiap kolom, lalu disebar lewat kode factorize.
+    """
+    columns = [col for col in df.columns if LIKERT_COL_PATTERN.match(col)]
+    # Urutan kolom (Fortran) agar slice per kolom bersebelahan di memori
+    values = np.full((len(df), len(columns)), LIKERT_MISSING, dtype=np.int8, order='F')
+    for j, col in enumerate(columns):
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            # Kolom categorical (skema Excel) sudah berkode: tidak perlu hashing ulang
+            codes, uniques = df[col].cat.codes.to_numpy(), df[col].cat.categories
+        else:
+            codes, uniques = pd.factorize(df[col])
+        lookup = np.array(
+            [LIKERT_MAPPING.get(label, LIKERT_MISSING) for label in uniques] + [LIKERT_MISSING],
+            dtype=np.int8
+        )
+        values[:, j] = lookup[codes]  # kode -1 (NaN) jatuh ke elemen terakhir
+    values.flags.writeable = False
+    return LikertMatrix(values, columns, {col: j for j, col in enumerate(columns)})
+
+
+def _likert_block(likert, col_list):
+    """Mengambil slice kolom dari matriks Likert untuk kolom yang tersedia."""
+    cols = [col for col in col_list if col in likert.index]
+    return cols, likert.values[:, [likert.index[col] for col in cols]]
+
+
+def calculate_likert_average(likert, col_list):
+    """Menghitung rata-rata skor untuk pertanyaan skala Likert dari matriks hasil encoding."""
+    cols, block = _likert_block(likert, col_list)
+    sums = block.sum(axis=0, dtype=np.int64)
+    counts = np.count_nonzero(block, axis=0)
+    averages = {col: sums[j] / counts[j] for j, col in enumerate(cols) if counts[j] > 0}
+    return pd.DataFrame.from_dict(averages, orient='index', columns=['Rata-rata']).sort_index()
+
+
+# Kelompok pertanyaan Likert: kolom yang dirata-rata di bagian Likert dan pola kolom
+# yang dipakai di tabel silang.
+LIKERT_AVERAGE_COLUMNS = {
+    "Tingkat Kepentingan": [f'Q{i}_{j}' for i in range(16, 20) for j in range(1, 6)],
+    "Tingkat Kepuasan": [f'Q{i}_{j}' for i in range(20, 25) for j in range(1, 6)],
+    "Tingkat Persesuaian": [f'Q{i}_{j}' for i in range(25, 29) for j in range(1, 5)],
+}
+LIKERT_PIVOT_PATTERNS = {
+    "Tingkat Kepentingan": re.compile(r'Q(1[6-9])_\d+'),
+    "Tingkat Kepuasan": re.compile(r'Q(2[0-4])_\d+'),
+    "Tingkat Persesuaian": re.compile(r'Q(2[5-8])_\d+'),
+}
+
+
+def likert_pivot_columns(likert, category):
+    """Kolom Likert milik satu kategori untuk tabel silang (dari matriks Likert atau kubus)."""
+    return [col for col in likert.columns if LIKERT_PIVOT_PATTERNS[category].match(col)]
+
+
+# --- 4. Tabel Silang ---
+# Kubus tabel silang: histogram skor Likert (1-5) per sel S1 x S2 x S3 beserta jumlah dan
+# banyaknya jawaban, dibuat sekali per dataset. Setiap dimensi punya slot terakhir untuk nilai
+# kosong, sehingga pivot satu atau dua dimensi cukup menjumlahkan sumbu lain tanpa memindai ulang
+# data responden. Histogram juga menjadi dasar bootstrap interval kepercayaan (lihat di bawah).
+CROSSTAB_DIMENSIONS = {'S1': 'Jenis Kelamin (S1)', 'S2': 'Usia (S2)', 'S3': 'Status Pernikahan (S3)'}
+
+CrosstabCube = namedtuple('CrosstabCube', ['dims', 'levels', 'columns', 'sums', 'counts', 'sizes', 'hist'])
+
+
+def build_crosstab_cube(df, likert, dims=tuple(CROSSTAB_DIMENSIONS)):
+    """Membangun kubus jumlah/banyak jawaban Likert per kombinasi kelompok dalam satu lintasan."""
+    dims = [dim for dim in dims if dim in df.columns]
+    codes, levels = [], []
+    for dim in dims:
+        dim_codes, uniques = pd.factorize(df[dim], sort=True)
+        dim_codes[dim_codes < 0] = len(uniques)  # slot kosong
+        codes.append(dim_codes)
+        levels.append([str(level) for level in uniques])
+
+    shape = tuple(len(dim_levels) + 1 for dim_levels in levels)
+    size = int(np.prod(shape))
+    flat = np.ravel_multi_index(codes, shape) if dims else np.zeros(len(df), dtype=np.intp)
+
+    n_cols, n_scores = len(likert.columns), len(LIKERT_SCORES) + 1
+    hist = np.empty((size, n_cols, len(LIKERT_SCORES)), dtype=np.int64)
+    offsets = flat * n_scores
+    for j in range(n_cols):
+        # Satu bincount per kolom: (sel, skor) -> banyak jawaban; skor 0 (kosong) dibuang
+        cell_scores = np.bincount(offsets + likert.values[:, j], minlength=size * n_scores)
+        hist[:, j] = cell_scores.reshape(size, n_scores)[:, 1:]
+    counts = hist.sum(axis=-1)
+    sums = (hist @ LIKERT_SCORES).astype(float)
+    sizes = np.bincount(flat, minlength=size)
+
+    return CrosstabCube(
+        dims, levels, likert.columns,
+        sums.reshape(shape + (n_cols,)), counts.reshape(shape + (n_cols,)), sizes.reshape(shape),
+        hist.reshape(shape + (n_cols, len(LIKERT_SCORES)))
+    )
+
+
+def crosstab_from_cube(cube, pivot_dims, col_list):
+    """
+    Rata-rata Likert per kelompok pivot (baris = pertanyaan, kolom = kelompok) dari kubus.
+    Hanya menjumlahkan dan membagi array kecil, tidak bergantung pada jumlah responden.
+    """
+    pivot = _PivotCells(cube, pivot_dims, col_list)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = pivot.columns(cube.sums) / pivot.columns(cube.counts)
+    return pivot.frame(means)
+
+
+class _PivotCells:
+    """Sel satu pivot (kombinasi level dimensi terpilih) dan kolom Likert terpilih pada kubus."""
+
+    def __init__(self, cube, pivot_dims, col_list):
+        self.axes = [cube.dims.index(dim) for dim in pivot_dims]
+        self.other_axes = tuple(i for i in range(len(cube.dims)) if i not in self.axes)
+        self.col_idx = [cube.columns.index(col) for col in col_list if col in cube.columns]
+        self.questions = [cube.columns[j] for j in self.col_idx]
+        labels = [' | '.join(combo) for combo in _level_combinations(cube, self.axes)]
+        self.keep = self.marginal(cube.sizes) > 0  # seperti groupby: kombinasi tanpa responden disembunyikan
+        self.labels = [label for label, kept in zip(labels, self.keep) if kept]
+
+    def marginal(self, array):
+        """Jumlahkan sumbu non-pivot, urutkan sumbu sesuai pivot, buang slot kosong, lalu ratakan selnya."""
+        axes = self.axes
+        array = np.moveaxis(array.sum(axis=self.other_axes), [sorted(axes).index(a) for a in axes], range(len(axes)))
+        array = array[tuple(slice(0, -1) for _ in axes)]
+        return array.reshape((-1,) + array.shape[len(axes):])
+
+    def columns(self, array):
+        """Marginal array per kolom Likert (sums/counts/hist) untuk kolom terpilih saja."""
+        return self.marginal(array)[:, self.col_idx]
+
+    def frame(self, values):
+        """DataFrame pertanyaan x kelompok (hanya sel berisi) dari array (sel, kolom)."""
+        return pd.DataFrame(values[self.keep].T, index=self.questions, columns=self.labels)
+
+
+def _level_combinations(cube, axes):
+    """Label kelompok untuk setiap sel pivot, berurutan seperti array hasil reshape."""
+    combos = [()]
+    for axis in axes:
+        combos = [combo + (level,) for combo in combos for level in cube.levels[axis]]
+    return combos
+
+
+def likert_average_from_cube(cube, col_list):
+    """Rata-rata Likert keseluruhan dari kubus (sama dengan calculate_likert_average)."""
+    all_axes = tuple(range(len(cube.dims)))
+    sums, counts = cube.sums.sum(axis=all_axes), cube.counts.sum(axis=all_axes)
+    averages = {
+        col: sums[j] / counts[j]
+        for j, col in enumerate(cube.columns) if col in col_list and counts[j] > 0
+    }
+    return pd.DataFrame.from_dict(averages, orient='index', columns=['Rata-rata']).sort_index()
+
+
+def _align_cube_dims(cube, dims):
+    """
+    Kubus dengan urutan dimensi `dims`. Dimensi yang tidak dimiliki kubus (mis. gelombang tanpa
+    kolom S3) ditambahkan sebagai sumbu tanpa level: semua respondennya berada di slot kosong.
+    """
+    if list(cube.dims) == list(dims):
+        return cube
+    order = [list(cube.dims).index(dim) for dim in dims if dim in cube.dims]
+
+    def align(array):
+        array = array.transpose(order + list(range(len(cube.dims), array.ndim)))
+        for axis, dim in enumerate(dims):
+            if dim not in cube.dims:
+                array = np.expand_dims(array, axis)
+        return array
+
+    levels = [cube.levels[list(cube.dims).index(dim)] if dim in cube.dims else [] for dim in dims]
+    return CrosstabCube(
+        list(dims), levels, cube.columns, align(cube.sums), align(cube.counts), align(cube.sizes),
+        None if cube.hist is None else align(cube.hist)
+    )
+
+
+def merge_crosstab_cubes(left, right):
+    """
+    Menggabungkan dua kubus dari potongan data yang berbeda. Dimensi, level tiap dimensi, dan
+    kolom Likert disatukan, lalu kedua kubus disebar ke bentuk gabungan dan dijumlahkan.
+    """
+    present = set(left.dims) | set(right.dims)
+    dims = [dim for dim in CROSSTAB_DIMENSIONS if dim in present]
+    for dim in [*left.dims, *right.dims]:
+        if dim not in dims:
+            dims.append(dim)
+    left, right = _align_cube_dims(left, dims), _align_cube_dims(right, dims)
+    levels = [
+        sorted(set(left_levels) | set(right_levels), key=_level_sort_key)
+        for left_levels, right_levels in zip(left.levels, right.levels)
+    ]
+    columns = list(left.columns) + [col for col in right.columns if col not in left.columns]
+    shape = tuple(len(dim_levels) + 1 for dim_levels in levels)
+
+    sums = np.zeros(shape + (len(columns),))
+    counts = np.zeros(shape + (len(columns),), dtype=np.int64)
+    sizes = np.zeros(shape, dtype=np.int64)
+    # Kubus lama (tanpa histogram) tetap bisa digabung, tetapi hasilnya tanpa histogram
+    with_hist = left.hist is not None and right.hist is not None
+    hist = np.zeros(shape + (len(columns), len(LIKERT_SCORES)), dtype=np.int64) if with_hist else None
+    for cube in (left, right):
+        # Posisi level lama di kubus gabungan; slot kosong tetap di posisi terakhir
+        index = [
+            np.array([dim_levels.index(level) for level in cube_levels] + [len(dim_levels)])
+            for cube_levels, dim_levels in zip(cube.levels, levels)
+        ]
+        col_index = np.array([columns.index(col) for col in cube.columns], dtype=np.intp)
+        cells = np.ix_(*index, col_index)
+        sums[cells] += cube.sums
+        counts[cells] += cube.counts
+        sizes[np.ix_(*index)] += cube.sizes
+        if with_hist:
+            hist[np.ix_(*index, col_index, np.arange(len(LIKERT_SCORES)))] += cube.hist
+    return CrosstabCube(left.dims, levels, columns, sums, counts, sizes, hist)
+
+
+# Interval kepercayaan bootstrap. Skor Likert hanya 1-5, sehingga histogram per sel adalah
+# statistik cukup: menarik ulang n responden sebuah sel sama dengan satu tarikan multinomial(n, p_sel).
+# Semua sel dan kolom ditarik sekaligus dalam satu panggilan NumPy per batch, jadi biayanya
+# sebanding dengan resample x sel x kolom, tidak bergantung pada jumlah responden.
+BOOTSTRAP_RESAMPLES = int(os.environ.get("SURVEY_BOOTSTRAP_RESAMPLES", "2000"))
+BOOTSTRAP_TIME_BUDGET = float(os.environ.get("SURVEY_BOOTSTRAP_SECONDS", "0.5"))
+BOOTSTRAP_BATCH_CELLS = 500_000  # resample x sel x kolom per batch (membatasi memori tarikan)
+
+CrosstabIntervals = namedtuple('CrosstabIntervals', ['lower', 'upper', 'significant', 'n_resamples'])
+
+
+def bootstrap_means(hist, n_resamples=BOOTSTRAP_RESAMPLES, time_budget=BOOTSTRAP_TIME_BUDGET, seed=0):
+    """
+    Rata-rata bootstrap untuk setiap sel histogram skor `hist` (..., skor): array (resample, ...).
+    Resample dikerjakan per batch; jika `time_budget` detik terlampaui, berhenti setelah batch
+    berjalan sehingga jumlah resample bisa lebih kecil dari `n_resamples`. Sel kosong bernilai NaN.
+    """
+    counts = hist.sum(axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pvals = hist / counts[..., None]
+    pvals[counts == 0] = 1.0 / hist.shape[-1]  # tarikan n=0 tetap butuh peluang yang valid
+
+    rng = np.random.default_rng(seed)
+    batch = max(1, min(n_resamples, BOOTSTRAP_BATCH_CELLS // max(counts.size, 1)))
+    samples, done, start = [], 0, time.perf_counter()
+    while done < n_resamples:
+        size = min(batch, n_resamples - done)
+        draws = rng.multinomial(counts, pvals, size=(size,) + counts.shape)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            samples.append((draws @ LIKERT_SCORES) / counts)
+        done += size
+        if time_budget is not None and time.perf_counter() - start > time_budget:
+            break
+    return np.concatenate(samples)
+
+
+def _percentile_interval(samples, confidence):
+    alpha = (1 - confidence) / 2
+    return np.quantile(samples, [alpha, 1 - alpha], axis=0)
+
+
+def likert_average_intervals(cube, col_list, confidence=0.95, n_resamples=BOOTSTRAP_RESAMPLES,
+                             time_budget=BOOTSTRAP_TIME_BUDGET):
+    """
+    Rata-rata Likert keseluruhan beserta interval kepercayaan bootstrap (persentil): kolom
+    Rata-rata, Batas Bawah, Batas Atas, n. Jumlah resample yang terpakai ada di `attrs['n_resamples']`.
+    None jika kubus tidak memiliki histogram.
+    """
+    if cube.hist is None:
+        return None
+    col_idx = [j for j, col in enumerate(cube.columns) if col in col_list]
+    hist = cube.hist.sum(axis=tuple(range(len(cube.dims))))[col_idx]
+    counts = hist.sum(axis=-1)
+    keep = counts > 0
+    hist, counts = hist[keep], counts[keep]
+    samples = bootstrap_means(hist, n_resamples, time_budget)
+    lower, upper = _percentile_interval(samples, confidence)
+    table = pd.DataFrame(
+        {'Rata-rata': (hist @ LIKERT_SCORES) / counts, 'Batas Bawah': lower, 'Batas Atas': upper, 'n': counts},
+        index=[cube.columns[j] for j, kept in zip(col_idx, keep) if kept]
+    ).sort_index()
+    table.attrs['n_resamples'] = len(samples)
+    return table
+
+
+def crosstab_intervals(cube, pivot_dims, col_list, confidence=0.95, n_resamples=BOOTSTRAP_RESAMPLES,
+                       time_budget=BOOTSTRAP_TIME_BUDGET):
+    """
+    Interval kepercayaan bootstrap untuk setiap sel crosstab_from_cube (bentuk DataFrame sama),
+    ditambah penanda signifikansi: selisih rata-rata sel dengan gabungan kelompok lain pada
+    pivot yang sama tidak memuat nol pada tingkat `confidence`. None jika kubus tanpa histogram.
+    """
+    if cube.hist is None:
+        return None
+    pivot = _PivotCells(cube, pivot_dims, col_list)
+    hist = pivot.columns(cube.hist)                      # (sel, kolom, skor)
+    counts = hist.sum(axis=-1)
+    samples = bootstrap_means(hist, n_resamples, time_budget)  # (resample, sel, kolom)
+    lower, upper = _percentile_interval(samples, confidence)
+
+    # Rata-rata kelompok lain per resample dari jumlah skor yang sudah ditarik untuk tiap sel
+    sums = np.where(counts > 0, samples * counts, 0.0)
+    rest_counts = counts.sum(axis=0) - counts
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rest_means = (sums.sum(axis=1, keepdims=True) - sums) / rest_counts
+    diff_lower, diff_upper = _percentile_interval(samples - rest_means, confidence)
+    significant = (diff_lower > 0) | (diff_upper < 0)
+
+    return CrosstabIntervals(pivot.frame(lower), pivot.frame(upper), pivot.frame(significant), len(samples))
+
+
+def _level_sort_key(level):
+    # Label numerik (mis. usia) diurutkan sebagai angka, sisanya sebagai teks
+    try:
+        return (0, float(level), '')
+    except ValueError:
+        return (1, 0.0, level)
+
+
+def pivot_dimension_options(cube):
+    """Pilihan pivot: setiap dimensi S1/S2/S3 yang ada dan kombinasi dua dimensinya."""
+    return [(dim,) for dim in cube.dims] + list(combinations(cube.dims, 2))
+
+
+# --- 5. Grafik ---
+def draw_frequency_chart(ax, table, y, palette, title, title_size=16):
+    """Grafik batang horizontal untuk tabel frekuensi."""
+    sns.barplot(x='Frekuensi', y=y, data=table, palette=palette, ax=ax)
+    ax.set_title(title, fontsize=title_size)
+    ax.set_xlabel('Frekuensi', fontsize=12)
+    ax.set_ylabel(y, fontsize=12)
+
+
+def draw_likert_chart(ax, averages, names=None):
+    """Grafik rata-rata Likert; `averages` berisi tabel rata-rata per kategori (`names` untuk legenda)."""
+    likert_avgs = pd.concat([avg.T if not avg.empty else pd.DataFrame() for avg in averages])
+    if names is not None:
+        likert_avgs.index = [name for name, avg in zip(names, averages) if not avg.empty]
+    likert_avgs.T.plot(kind='bar', ax=ax, rot=45, cmap='cividis')
+    ax.set_title('Rata-rata Skala Likert Berdasarkan Kategori', fontsize=16)
+    ax.set_ylabel('Rata-rata Skor', fontsize=12)
+    ax.set_xlabel('Pertanyaan', fontsize=12)
+    ax.figure.tight_layout()
+
+
+def draw_trend_chart(ax, trend_table, title, ylabel):
+    """Grafik garis per gelombang; baris `trend_table` adalah seri, kolomnya gelombang."""
+    trend_table.T.plot(kind='line', marker='o', ax=ax)
+    ax.set_title(title, fontsize=16)
+    ax.set_xlabel('Gelombang', fontsize=12)
+    ax.set_ylabel(ylabel, fontsize=12)
+    ax.legend(fontsize=8, loc='center left', bbox_to_anchor=(1, 0.5))
+    ax.figure.tight_layout()
+
+
+def draw_crosstab_chart(ax, pivot_table, title, lower=None, upper=None):
+    """Grafik batang rata-rata Likert per kelompok pivot; `lower`/`upper` menambah error bar interval."""
+    yerr = None
+    if lower is not None and upper is not None:
+        # Error bar asimetris untuk DataFrame: array (seri, 2, baris)
+        yerr = np.stack([(pivot_table - lower).T.to_numpy(), (upper - pivot_table).T.to_numpy()], axis=1)
+    pivot_table.plot(kind='bar', ax=ax, rot=45, yerr=yerr, capsize=2 if yerr is not None else 0)
+    ax.set_title(title, fontsize=16)
+    ax.set_ylabel('Rata-rata Skor', fontsize=12)
+    ax.figure.tight_layout()
+
+
+# Grafik Plotly: hanya tabel agregat kecil (frekuensi, rata-rata, pivot) yang dikirim ke browser
+# dan digambar di sisi klien, sehingga ukuran payload tidak bergantung pada jumlah responden.
+# Argumen setiap fungsi sama dengan padanan draw_*-nya, tanpa `ax`.
+PLOTLY_AVAILABLE = go is not None
+PLOTLY_COLORSCALES = {'viridis': 'Viridis', 'magma': 'Magma', 'plasma': 'Plasma', 'coolwarm': 'RdBu_r'}
+
+
+def _plotly_layout(figure, title, title_size=16, **layout):
+    figure.update_layout(
+        title={'text': title, 'font': {'size': title_size}}, margin={'l': 10, 'r': 10, 't': 60, 'b': 10},
+        template='plotly_white', **layout
+    )
+    return figure
+
+
+def plotly_frequency_chart(table, y, palette, title, title_size=16):
+    """Grafik batang horizontal interaktif; urutan batang mengikuti urutan baris `table`."""
+    hover = '%{y}<br>Frekuensi: %{x}'
+    customdata = None
+    if 'Persentase' in table:
+        customdata = table['Persentase'].astype(float).tolist()  # NA (responden tak tepat) -> NaN
+        hover += '<br>Persentase: %{customdata:.2f}%'
+    figure = go.Figure(go.Bar(
+        x=table['Frekuensi'].tolist(), y=[str(label) for label in table[y]], orientation='h',
+        marker={'color': table['Frekuensi'].tolist(), 'colorscale': PLOTLY_COLORSCALES.get(palette, palette)},
+        customdata=customdata, hovertemplate=hover + '<extra></extra>',
+    ))
+    return _plotly_layout(
+        figure, title, title_size, xaxis_title='Frekuensi', yaxis_title=y,
+        yaxis={'autorange': 'reversed', 'type': 'category'}, height=max(300, 28 * len(table) + 120)
+    )
+
+
+def plotly_likert_chart(averages, names=None):
+    """Rata-rata Likert per pertanyaan, satu seri per kategori (klik legenda untuk menyaring)."""
+    names = names or ['Rata-rata'] * len(averages)
+    figure = go.Figure([
+        go.Bar(x=average.index.tolist(), y=average['Rata-rata'].round(3).tolist(), name=name)
+        for name, average in zip(names, averages) if not average.empty
+    ])
+    return _plotly_layout(
+        figure, 'Rata-rata Skala Likert Berdasarkan Kategori', xaxis_title='Pertanyaan',
+        yaxis_title='Rata-rata Skor', barmode='group', height=550
+    )
+
+
+def plotly_crosstab_chart(pivot_table, title, lower=None, upper=None):
+    """Rata-rata Likert per pertanyaan, satu seri per kelompok pivot; `lower`/`upper` untuk error bar."""
+    questions = [str(label) for label in pivot_table.index]
+
+    def error_bars(col):
+        if lower is None or upper is None:
+            return None
+        return {'type': 'data', 'symmetric': False,
+                'array': (upper[col] - pivot_table[col]).round(3).tolist(),
+                'arrayminus': (pivot_table[col] - lower[col]).round(3).tolist()}
+
+    figure = go.Figure([
+        go.Bar(x=questions, y=pivot_table[col].round(3).tolist(), name=str(col), error_y=error_bars(col))
+        for col in pivot_table.columns
+    ])
+    return _plotly_layout(figure, title, yaxis_title='Rata-rata Skor', barmode='group', height=550)
+
+
+def plotly_trend_chart(trend_table, title, ylabel):
+    """Grafik garis per gelombang; baris `trend_table` adalah seri, kolomnya gelombang."""
+    waves = [str(wave) for wave in trend_table.columns]
+    figure = go.Figure([
+        go.Scatter(x=waves, y=trend_table.loc[label].round(3).tolist(), name=str(label), mode='lines+markers')
+        for label in trend_table.index
+    ])
+    return _plotly_layout(figure, title, xaxis_title='Gelombang', yaxis_title=ylabel, height=450)
+
+
+def render_png(draw, figsize, dpi=200):
+    """
+    Menggambar `draw(ax)` ke PNG. Figure dibuat tanpa pyplot (aman dipakai antar thread)
+    dan dibersihkan segera setelah disimpan.
+    """
+    fig = Figure(figsize=figsize)
+    try:
+        draw(fig.subplots())
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+    finally:
+        fig.clear()
+    return buffer.getvalue()
+
+
+# Cache render grafik: PNG disimpan per kunci (dataset, bagian, parameter) sehingga grafik
+# yang sama tidak perlu digambar ulang dengan matplotlib.
+class ChartCache:
+    """Cache PNG bersama antar sesi dengan batas total byte dan penggusuran LRU."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            png = self._images.get(key)
+            if png is not None:
+                self._images.move_to_end(key)
+            return png
+
+    def put(self, key, png):
+        with self._lock:
+            if key in self._images:
+                self.size -= len(self._images.pop(key))
+            self._images[key] = png
+            self.size += len(png)
+            while self.size > self.max_bytes and len(self._images) > 1:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+
+
+# --- 6. Statistik Gabungan & Streaming ---
+# File yang lebih besar dari RAM dibaca per potongan (chunk). Setiap potongan menghasilkan
+# statistik cukup yang dapat dijumlahkan (hitungan, jumlah/banyak Likert, kubus tabel silang),
+# sehingga memori puncak ditentukan oleh ukuran potongan, bukan ukuran file.
+STREAM_CHUNKSIZE = 100_000
+BRAND_IMAGE_COLUMNS = [f'Q15_{i}' for i in range(1, 9)]
+
+# Hitungan merek satu tabel multi-respon. `approximate` berisi nama merek yang jumlah respondennya
+# tidak bisa dihitung tepat dari statistik teragregasi (lihat SurveyStats.brand_counts).
+BrandCounts = namedtuple('BrandCounts', ['mentions', 'reach', 'variants', 'approximate'])
+
+
+def _counters(codes, labels):
+    mentions, reach = _mentions_reach(codes, len(labels))
+    return Counter(dict(zip(labels, mentions.tolist()))), Counter(dict(zip(labels, reach.tolist())))
+
+
+class SurveyStats:
+    """
+    Ringkasan survei yang dapat digabung; menyediakan tabel yang sama dengan dashboard.
+    Hitungan multi-respon disimpan per ejaan mentah, dan bila dibangun dengan BrandNormalizer juga
+    per ID merek (`brand_mentions`/`brand_reach`, berlaku untuk `brand_version` normalizer itu),
+    sehingga jumlah responden per merek tetap tepat setelah potongan/gelombang digabung.
+    """
+
+    def __init__(self, columns=(), n_rows=0, mentions=None, reach=None, value_counts=None, cube=None,
+                 brand_version=None, brand_mentions=None, brand_reach=None):
+        self.columns = list(columns)
+        self.n_rows = n_rows
+        self.mentions = mentions or {}          # tabel multi-respon -> Counter(restoran -> sebutan)
+        self.reach = reach or {}                # tabel multi-respon -> Counter(restoran -> responden)
+        self.value_counts = value_counts or {}  # kolom -> Counter(jawaban -> frekuensi)
+        self.cube = cube
+        self.brand_version = brand_version
+        self.brand_mentions = brand_mentions or {}  # tabel multi-respon -> Counter(ID merek -> sebutan)
+        self.brand_reach = brand_reach or {}        # tabel multi-respon -> Counter(ID merek -> responden)
+        self.dataset_id = None
+
+    def __len__(self):
+        return self.n_rows
+
+    @classmethod
+    def from_frame(cls, df, normalizer=None):
+        """
+        Statistik untuk satu DataFrame (satu potongan atau seluruh data). Dengan `normalizer`
+        hitungan per ID merek ikut disimpan di samping hitungan per ejaan mentah.
+        """
+        mentions, reach, brand_mentions, brand_reach = {}, {}, {}, {}
+        for name, cols in multi_response_groups(df.columns).items():
+            codes, uniques = _multi_response_codes(df, cols)
+            mentions[name], reach[name] = _counters(codes, uniques)
+            if normalizer is not None:
+                brand_codes, brand_ids = _relabel(codes, normalizer.brand_ids(uniques))
+                brand_mentions[name], brand_reach[name] = _counters(brand_codes, brand_ids)
+        value_counts = {
+            col: Counter(df[col].value_counts().to_dict())
+            for col in BRAND_IMAGE_COLUMNS if col in df.columns
+        }
+        cube = build_crosstab_cube(df, encode_likert(df))
+        return cls(
+            df.columns, len(df), mentions, reach, value_counts, cube,
+            None if normalizer is None else normalizer.version, brand_mentions, brand_reach
+        )
+
+    def merge(self, other):
+        """Statistik gabungan dari dua kumpulan responden yang saling lepas."""
+        if self.cube is None:
+            return other
+        if other.cube is None:
+            return self
+
+        def add(left, right):
+            return {key: left.get(key, Counter()) + right.get(key, Counter()) for key in {**left, **right}}
+
+        columns = self.columns + [col for col in other.columns if col not in self.columns]
+        # Hitungan per ID merek hanya bisa dijumlahkan bila dibuat dengan pemetaan yang sama
+        same_brands = self.brand_version is not None and self.brand_version == other.brand_version
+        return SurveyStats(
+            columns, self.n_rows + other.n_rows,
+            add(self.mentions, other.mentions), add(self.reach, other.reach),
+            add(self.value_counts, other.value_counts),
+            merge_crosstab_cubes(self.cube, other.cube),
+            self.brand_version if same_brands else None,
+            add(self.brand_mentions, other.brand_mentions) if same_brands else None,
+            add(self.brand_reach, other.brand_reach) if same_brands else None,
+        )
+
+    def brand_counts(self, name, normalizer=None):
+        """
+        BrandCounts untuk tabel multi-respon `name`; tanpa `normalizer` per ejaan mentah.
+        Dengan `normalizer` versi yang sama seperti saat statistik dibuat, hitungan per ID merek
+        dipakai sehingga sebutan dan responden tepat. Responden hanya tidak tepat untuk merek yang
+        digabung dari beberapa ID saat dibaca (salah ketik merek tak dikenal, atau statistik lama
+        / versi lain yang hanya punya hitungan per ejaan): nama merek itu dicatat di `approximate`.
+        """
+        mentions, reach = self.mentions.get(name, Counter()), self.reach.get(name, Counter())
+        if normalizer is None or not mentions:
+            return BrandCounts(mentions, reach, {}, set())
+        spellings = list(mentions)
+        ids = normalizer.brand_ids(spellings)
+        names = normalizer.display_names(ids, spellings, [mentions[spelling] for spelling in spellings])
+
+        if self.brand_version == normalizer.version and name in self.brand_mentions:
+            name_of_id = dict(zip(ids, names))
+            parts = [
+                (name_of_id.get(brand_id, brand_id), brand_id, count, self.brand_reach[name][brand_id])
+                for brand_id, count in self.brand_mentions[name].items()
+            ]
+        else:
+            parts = [(label, spelling, mentions[spelling], reach[spelling]) for spelling, label in zip(spellings, names)]
+
+        merged_mentions, merged_reach, sources = Counter(), Counter(), {}
+        for label, source, count, respondents in parts:
+            if label is None:
+                continue
+            merged_mentions[label] += count
+            merged_reach[label] += respondents
+            sources.setdefault(label, set()).add(source)
+        # Tabel satu kolom (top of mind): setiap responden paling banyak satu sebutan, jumlahnya tetap tepat
+        single_column = len(multi_response_groups(self.columns).get(name, ())) <= 1
+        approximate = set() if single_column else {
+            label for label, label_sources in sources.items() if len(label_sources) > 1
+        }
+        variants = {}
+        for spelling, label in zip(spellings, names):
+            if label is not None and spelling != label:
+                variants.setdefault(label, []).append(spelling)
+        return BrandCounts(merged_mentions, merged_reach, variants, approximate)
+
+    def multi_response_table(self, name, normalizer=None):
+        """
+        Tabel Restoran/Frekuensi/Responden seperti count_multi_response. Responden merek yang tidak
+        bisa dihitung tepat (BrandCounts.approximate) dikosongkan dan dicatat di `attrs['approximate_reach']`.
+        """
+        counts = self.brand_counts(name, normalizer)
+        table = pd.DataFrame(
+            [(brand, count, counts.reach[brand]) for brand, count in counts.mentions.items()],
+            columns=MULTI_RESPONSE_COLUMNS
+        )
+        if counts.approximate:
+            table['Responden'] = table['Responden'].astype('Int64').mask(table['Restoran'].isin(counts.approximate))
+            table.attrs['approximate_reach'] = sorted(counts.approximate)
+        table = table.sort_values('Frekuensi', ascending=False, kind='stable').reset_index(drop=True)
+        if counts.variants:
+            table.attrs['brand_variants'] = counts.variants
+        return table
+
+    def value_counts_table(self, col):
+        """Tabel Respons/Frekuensi seperti value_counts_table."""
+        table = pd.DataFrame(self.value_counts.get(col, Counter()).most_common(), columns=['Respons', 'Frekuensi'])
+        return table
+
+    def likert_average(self, col_list):
+        return likert_average_from_cube(self.cube, col_list)
+
+    def save(self, path):
+        """
+        Menyimpan statistik ke satu file .npz (array kubus + metadata JSON) secara atomik,
+        sehingga gelombang lama tidak perlu di-parse ulang dari file mentahnya.
+        """
+        def pairs(counters):
+            return {key: [[_native(item), count] for item, count in counter.items()]
+                    for key, counter in counters.items()}
+
+        meta = {
+            'columns': self.columns, 'n_rows': self.n_rows, 'dataset_id': self.dataset_id,
+            'mentions': pairs(self.mentions), 'reach': pairs(self.reach),
+            'value_counts': pairs(self.value_counts),
+        }
+        if self.brand_version is not None:
+            meta['brands'] = {'version': self.brand_version, 'mentions': pairs(self.brand_mentions),
+                              'reach': pairs(self.brand_reach)}
+        arrays = {}
+        if self.cube is not None:
+            meta['cube'] = {'dims': list(self.cube.dims), 'levels': self.cube.levels,
+                            'columns': list(self.cube.columns)}
+            arrays = {'sums': self.cube.sums, 'counts': self.cube.counts, 'sizes': self.cube.sizes}
+            if self.cube.hist is not None:
+                arrays['hist'] = self.cube.hist
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as handle:
+                np.savez(handle, meta=np.array(json.dumps(meta)), **arrays)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load(cls, path):
+        """Kebalikan dari save()."""
+        with np.load(path) as archive:
+            meta = json.loads(archive['meta'].item())
+            cube = None
+            if 'cube' in meta:
+                cube = CrosstabCube(
+                    meta['cube']['dims'], meta['cube']['levels'], meta['cube']['columns'],
+                    archive['sums'], archive['counts'], archive['sizes'],
+                    archive['hist'] if 'hist' in archive.files else None
+                )
+
+        def counters(pairs):
+            return {key: Counter(dict((item, count) for item, count in items)) for key, items in pairs.items()}
+
+        brands = meta.get('brands', {})
+        stats = cls(
+            meta['columns'], meta['n_rows'], counters(meta['mentions']), counters(meta['reach']),
+            counters(meta['value_counts']), cube,
+            brands.get('version'), counters(brands.get('mentions', {})), counters(brands.get('reach', {}))
+        )
+        stats.dataset_id = meta['dataset_id']
+        return stats
+
+
+def _native(value):
+    # Kunci Counter dari pandas bisa bertipe numpy (mis. np.int64) yang tidak bisa di-JSON-kan
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def stream_survey_csv(source, chunksize=STREAM_CHUNKSIZE, normalizer=None):
+    """
+    Membaca CSV per potongan `chunksize` baris dan menggabungkan statistiknya. Hanya kolom S*/Q*
+    yang dibaca, dan semuanya sebagai teks agar tipe tidak berubah-ubah antar potongan.
+    Dengan `normalizer`, hitungan per ID merek ikut disimpan sehingga jumlah responden per
+    merek tetap tepat setelah potongan digabung.
+    """
+    stats = SurveyStats()
+    reader = pd.read_csv(
+        source, chunksize=chunksize, dtype=str, usecols=lambda col: bool(SURVEY_COL_PATTERN.match(col))
+    )
+    for chunk in reader:
+        stats = stats.merge(SurveyStats.from_frame(chunk, normalizer))
+    return stats
+
+
+# --- 7. Laporan Lengkap ---
+ReportItem = namedtuple('ReportItem', ['table', 'draw', 'figsize'])
+
+
+def pivot_label(pivot_dims):
+    """Label pivot untuk tampilan, mis. 'Jenis Kelamin (S1) × Usia (S2)'."""
+    return ' × '.join(CROSSTAB_DIMENSIONS[dim] for dim in pivot_dims)
+
+
+def build_report(source, normalizer=None):
+    """
+    Menghitung semua tabel dashboard untuk satu dataset (DataFrame atau SurveyStats hasil
+    streaming). Mengembalikan dict nama -> ReportItem; `draw` bernilai None untuk tabel tanpa grafik.
+    `normalizer` (BrandNormalizer) menggabungkan ejaan merek pada tabel multi-respon.
+    """
+    stats = source if isinstance(source, SurveyStats) else SurveyStats.from_frame(source, normalizer)
+    report = {}
+
+    if 'Q1_1' in stats.columns:
+        q1_freq = stats.multi_response_table('top_of_mind', normalizer).drop(columns='Responden')
+        q1_freq['Persentase'] = (q1_freq['Frekuensi'] / len(stats) * 100).round(2)
+        report['top_of_mind'] = ReportItem(
+            q1_freq, lambda ax: draw_frequency_chart(ax, q1_freq, 'Restoran', 'viridis', 'Top of Mind Frequency'),
+            (10, 6)
+        )
+
+    for name, palette, title in [
+        ('unaided_awareness', 'magma', 'Unaided Awareness Frequency'),
+        ('total_awareness', 'plasma', 'Total Awareness Frequency'),
+    ]:
+        freq = stats.multi_response_table(name, normalizer)
+        if not freq.empty:
+            freq['Persentase'] = (freq['Responden'] / len(stats) * 100).round(2)
+            report[name] = ReportItem(
+                freq, lambda ax, freq=freq, palette=palette, title=title:
+                    draw_frequency_chart(ax, freq, 'Restoran', palette, title),
+                (10, 6)
+            )
+
+    for col in BRAND_IMAGE_COLUMNS:
+        freq_data = stats.value_counts_table(col)
+        if not freq_data.empty:
+            report[f'brand_image_{col}'] = ReportItem(
+                freq_data, lambda ax, freq_data=freq_data, col=col:
+                    draw_frequency_chart(ax, freq_data, 'Respons', 'coolwarm', f'Frekuensi {col}', title_size=14),
+                (8, 5)
+            )
+
+    averages = []
+    for category, cols in LIKERT_AVERAGE_COLUMNS.items():
+        average = stats.likert_average(cols)
+        averages.append(average)
+        if not average.empty:
+            report[f'likert_{_slug(category)}'] = ReportItem(average, None, None)
+    if any(not average.empty for average in averages):
+        report['likert_averages'] = ReportItem(
+            None, lambda ax: draw_likert_chart(ax, averages), (15, 8)
+        )
+
+    cube = stats.cube
+    for category in LIKERT_PIVOT_PATTERNS:
+        cols_to_pivot = likert_pivot_columns(cube, category)
+        if not cols_to_pivot:
+            continue
+        for pivot_dims in pivot_dimension_options(cube):
+            pivot_table = crosstab_from_cube(cube, pivot_dims, cols_to_pivot)
+            title = f'Tabel Silang {category} berdasarkan {pivot_label(pivot_dims)}'
+            report[f"crosstab_{_slug(category)}_{'_'.join(pivot_dims)}"] = ReportItem(
+                pivot_table, lambda ax, pivot_table=pivot_table, title=title:
+                    draw_crosstab_chart(ax, pivot_table, title),
+                (15, 8)
+            )
+    return report
+
+
+def _slug(text):
+    return re.sub(r'\W+', '_', text.strip().lower())
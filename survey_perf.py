@@ -0,0 +1,129 @@
+# ==============================================================================
+# Instrumentasi Performa
+# Merekam waktu, kenaikan memori puncak, jumlah baris, dan status cache setiap tahap
+# dashboard. Tanpa Streamlit; panel diagnostik di testter.py membaca rekaman ini.
+# ==============================================================================
+
+import json
+import os
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Batas rekaman per sesi; rekaman tertua dibuang agar riwayat (dan unduhannya) tidak tumbuh tanpa batas
+PERF_MAX_RECORDS = int(os.environ.get("SURVEY_PERF_MAX_RECORDS", "2000"))
+
+# tracemalloc berlaku untuk seluruh proses, sedangkan diagnostik diaktifkan per sesi. Pelacakan
+# dimulai saat perekam pertama memintanya dan dihentikan saat perekam terakhir berhenti memintanya
+# (dimatikan, atau sesinya berakhir dan perekamnya dibuang).
+_tracing_lock = threading.Lock()
+_tracing_recorders = set()  # id perekam yang sedang meminta pelacakan memori
+_tracing_started = False    # True jika pelacakan dimulai di sini (bukan oleh pemanggil lain)
+
+
+def _acquire_tracing(recorder_id):
+    global _tracing_started
+    with _tracing_lock:
+        _tracing_recorders.add(recorder_id)
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_started = True
+
+
+def _release_tracing(recorder_id):
+    global _tracing_started
+    with _tracing_lock:
+        _tracing_recorders.discard(recorder_id)
+        if not _tracing_recorders and _tracing_started:
+            tracemalloc.stop()
+            _tracing_started = False
+
+
+class PerfRecorder:
+    """
+    Kumpulan rekaman performa satu sesi. Setiap rerun menaikkan `run`, dan setiap tahap yang
+    diukur menjadi satu dict (run, stage, seconds, peak_mb, rows, cache, ...).
+    Memori hanya diukur bila `trace_memory` aktif karena tracemalloc memperlambat alokasi.
+    Puncak memori dihitung dari tracemalloc milik seluruh proses, sehingga saat beberapa sesi
+    berjalan bersamaan `peak_mb` ikut memuat alokasi sesi lain dan hanya bersifat perkiraan.
+    Hanya `max_records` rekaman terakhir yang disimpan.
+    """
+
+    def __init__(self, session_id=None, trace_memory=True, max_records=PERF_MAX_RECORDS):
+        self.session_id = session_id
+        self.trace_memory = trace_memory
+        self.run = 0
+        self.records = deque(maxlen=max_records)
+        self._stack = []
+        # Melepas permintaan pelacakan saat perekam dibuang (mis. sesi Streamlit berakhir)
+        weakref.finalize(self, _release_tracing, id(self))
+
+    def start_run(self):
+        """Menandai awal rerun baru; meminta/melepas pelacakan tracemalloc sesuai `trace_memory`."""
+        self.run += 1
+        if self.trace_memory:
+            _acquire_tracing(id(self))
+        else:
+            _release_tracing(id(self))
+        return self.run
+
+    def stop(self):
+        """Diagnostik dimatikan: melepas pelacakan memori; tracemalloc berhenti jika tidak ada peminat lain."""
+        _release_tracing(id(self))
+
+    @contextmanager
+    def measure(self, stage, rows=None, **extra):
+        """
+        Mengukur satu tahap. Dict yang di-yield boleh dilengkapi di dalam blok
+        (mis. `record['cache'] = 'hit'` atau `record['rows'] = len(df)`).
+        """
+        # `depth` 0 berarti tahap teratas; total waktu rerun = jumlah seconds pada depth 0
+        record = {'run': self.run, 'stage': stage, 'depth': len(self._stack), 'rows': rows,
+                  'cache': None, **extra}
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        frame = {'child_peak': 0}
+        if tracing:
+            frame['base'] = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._stack.append(frame)
+
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            self._stack.pop()
+            if tracing:
+                # reset_peak() pada tahap bersarang menghapus puncak milik tahap induk,
+                # jadi puncak anak diteruskan ke induk secara eksplisit.
+                peak = max(tracemalloc.get_traced_memory()[1], frame['child_peak'])
+                record['peak_mb'] = round(max(peak - frame['base'], 0) / 1024 / 1024, 3)
+                if self._stack:
+                    self._stack[-1]['child_peak'] = max(self._stack[-1]['child_peak'], peak)
+            else:
+                record['peak_mb'] = None
+            record['timestamp'] = datetime.now(timezone.utc).isoformat()
+            if self.session_id is not None:
+                record['session'] = self.session_id
+            self.records.append(record)
+
+    def run_records(self, run=None):
+        """Rekaman satu rerun (default: rerun terakhir)."""
+        run = self.run if run is None else run
+        return [record for record in self.records if record['run'] == run]
+
+    def to_json(self):
+        return json.dumps(list(self.records), indent=2, default=str)
+
+    def to_jsonl(self, records=None):
+        records = self.records if records is None else records
+        return ''.join(json.dumps(record, default=str) + '\n' for record in records)
+
+    def append_jsonl(self, path, run=None):
+        """Menambahkan rekaman satu rerun ke file JSONL (untuk analisis sesi produksi)."""
+        with open(path, 'a') as handle:
+            handle.write(self.to_jsonl(self.run_records(run)))
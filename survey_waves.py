@@ -0,0 +1,204 @@
+# ==============================================================================
+# Penyimpanan Statistik per Gelombang
+# Setiap gelombang survei bulanan diringkas sekali menjadi SurveyStats (jumlah sebutan merek,
+# jumlah/banyak jawaban Likert, kubus tabel silang) dan disimpan di direktori lokal. Tampilan
+# kumulatif dan tren dibangun dengan menggabungkan statistik tersimpan, tanpa membaca ulang
+# file mentah gelombang lama.
+#
+# Contoh (dari root repo):
+#   python survey_waves.py add "2024-05" data/gelombang_mei.csv
+#   python survey_waves.py list
+# ==============================================================================
+
+import argparse
+import io
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from survey_engine import (
+    STREAM_CHUNKSIZE, SurveyStats, content_digest, load_brand_normalizer, load_survey_bytes,
+    stream_survey_csv,
+)
+
+WAVE_STORE_DIR = os.environ.get(
+    "SURVEY_WAVE_STORE_DIR", os.path.join(os.path.expanduser("~"), ".survey_dashboard", "waves")
+)
+
+
+class WaveStore:
+    """
+    Direktori berisi satu file statistik (.npz) per gelombang dan manifest.json berurutan
+    (nama, digest isi file, jumlah responden, nama file asal, waktu ditambahkan).
+    Nama merek disimpan mentah, ditambah hitungan per ID merek bila `normalizer` diberikan.
+    Normalisasi diterapkan saat tabel dibaca (lihat awareness_trend): hitungan per ID dipakai bila
+    versi normalizer sama, selain itu ejaan mentah digabung sehingga gelombang lama tetap
+    mengikuti kamus alias terbaru.
+    """
+
+    def __init__(self, root=WAVE_STORE_DIR, normalizer=None):
+        self.root = root
+        self.normalizer = normalizer
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    @property
+    def _manifest_path(self):
+        return os.path.join(self.root, 'manifest.json')
+
+    def _stats_path(self, digest):
+        return os.path.join(self.root, f'{digest}.npz')
+
+    def waves(self):
+        """Daftar entri manifest sesuai urutan penambahan."""
+        if not os.path.exists(self._manifest_path):
+            return []
+        with open(self._manifest_path) as handle:
+            return json.load(handle)
+
+    def _write_manifest(self, waves):
+        tmp_path = f"{self._manifest_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as handle:
+            json.dump(waves, handle, indent=2)
+        os.replace(tmp_path, self._manifest_path)
+
+    def add_wave(self, name, raw_bytes, filename, chunksize=STREAM_CHUNKSIZE, sheet_name=None):
+        """
+        Meringkas satu file gelombang dan menyimpannya. Hanya responden gelombang ini yang diproses;
+        file yang isinya sudah tersimpan tidak diproses ulang. Nama yang sudah ada akan diganti.
+        `sheet_name` memilih sheet untuk file Excel. Mengembalikan entri manifest gelombang tersebut.
+        Isi yang sama dengan nama yang sama tidak mengubah apa pun; isi yang sudah tersimpan
+        dengan nama lain ditolak (ValueError) agar gelombang tersebut tidak tergantikan diam-diam.
+        """
+        is_csv = filename.lower().endswith('.csv')
+        digest = content_digest(raw_bytes, None if is_csv else sheet_name)
+        existing = {wave['digest']: wave for wave in self.waves()}
+        if digest in existing and os.path.exists(self._stats_path(digest)):
+            if existing[digest]['name'] == name:
+                return existing[digest]
+            raise ValueError(f"Isi file sama dengan gelombang '{existing[digest]['name']}' yang sudah tersimpan.")
+        if is_csv:
+            stats = stream_survey_csv(io.BytesIO(raw_bytes), chunksize, self.normalizer)
+        else:
+            stats = SurveyStats.from_frame(load_survey_bytes(raw_bytes, filename, sheet_name), self.normalizer)
+
+        with self._lock:
+            stats.dataset_id = digest
+            stats.save(self._stats_path(digest))
+            waves = [wave for wave in self.waves() if wave['name'] != name and wave['digest'] != digest]
+            entry = {
+                'name': name, 'digest': digest, 'filename': os.path.basename(filename),
+                'n_rows': len(stats),
+                'added': datetime.now(timezone.utc).isoformat(),
+            }
+            self._write_manifest(waves + [entry])
+            self._remove_orphans()
+        return entry
+
+    def remove_wave(self, name):
+        with self._lock:
+            self._write_manifest([wave for wave in self.waves() if wave['name'] != name])
+            self._remove_orphans()
+
+    def _remove_orphans(self):
+        # File statistik yang tidak lagi dirujuk manifest (gelombang diganti/dihapus)
+        digests = {wave['digest'] for wave in self.waves()}
+        for name in os.listdir(self.root):
+            if name.endswith('.npz') and name[:-len('.npz')] not in digests:
+                os.remove(os.path.join(self.root, name))
+
+    def load_stats(self, digest):
+        return SurveyStats.load(self._stats_path(digest))
+
+    def stats_by_wave(self, names=None):
+        """dict nama gelombang -> SurveyStats (urutan manifest), opsional hanya `names`."""
+        return {
+            wave['name']: self.load_stats(wave['digest'])
+            for wave in self.waves() if names is None or wave['name'] in names
+        }
+
+
+def cumulative_stats(stats_by_wave):
+    """Statistik gabungan semua gelombang (responden antar gelombang saling lepas)."""
+    total = SurveyStats()
+    for stats in stats_by_wave.values():
+        total = total.merge(stats)
+    total.dataset_id = 'waves:' + '+'.join(str(stats.dataset_id) for stats in stats_by_wave.values())
+    return total
+
+
+def awareness_trend(stats_by_wave, name, normalizer=None):
+    """
+    Persentase responden yang menyebut tiap merek per gelombang untuk tabel multi-respon `name`
+    (baris: merek, kolom: gelombang). Top of mind memakai Frekuensi, sama seperti dashboard.
+    Dengan `normalizer` ejaan merek digabung ke nama bakunya di setiap gelombang; persentase
+    responden yang tidak bisa dihitung tepat (BrandCounts.approximate) dibiarkan kosong (NaN).
+    """
+    columns, approximate = {}, {}
+    for wave, stats in stats_by_wave.items():
+        counts = stats.brand_counts(name, normalizer)
+        if name == 'top_of_mind':
+            values = counts.mentions
+        else:
+            values = counts.reach
+            approximate[wave] = counts.approximate
+        if values and len(stats):
+            columns[wave] = pd.Series(values, dtype=float) / len(stats) * 100
+    trend = pd.DataFrame(columns).fillna(0.0).round(2)
+    if trend.empty:
+        return trend
+    for wave, labels in approximate.items():
+        if labels and wave in trend:
+            trend.loc[sorted(labels), wave] = float('nan')
+    trend.index.name = 'Restoran'
+    return trend.loc[trend.mean(axis=1).sort_values(ascending=False, kind='stable').index]
+
+
+def likert_trend(stats_by_wave, col_list):
+    """Rata-rata Likert per pertanyaan per gelombang (baris: pertanyaan, kolom: gelombang)."""
+    columns = {}
+    for wave, stats in stats_by_wave.items():
+        if stats.cube is not None:
+            average = stats.likert_average(col_list)['Rata-rata']
+            if not average.empty:
+                columns[wave] = average
+    return pd.DataFrame(columns).sort_index()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Kelola statistik survei per gelombang.")
+    parser.add_argument('--store', default=WAVE_STORE_DIR, help="Direktori penyimpanan gelombang.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    add = commands.add_parser('add', help="Ringkas dan simpan satu file gelombang.")
+    add.add_argument('name', help="Nama gelombang, mis. 2024-05.")
+    add.add_argument('path', help="File survei CSV/XLSX gelombang tersebut.")
+    add.add_argument('--chunksize', type=int, default=STREAM_CHUNKSIZE)
+    add.add_argument('--sheet', help="Nama sheet untuk file Excel (default: sheet pertama).")
+    remove = commands.add_parser('remove', help="Hapus satu gelombang.")
+    remove.add_argument('name')
+    commands.add_parser('list', help="Tampilkan gelombang tersimpan.")
+    args = parser.parse_args(argv)
+
+    store = WaveStore(args.store, load_brand_normalizer())
+    if args.command == 'add':
+        with open(args.path, 'rb') as handle:
+            raw_bytes = handle.read()
+        try:
+            entry = store.add_wave(args.name, raw_bytes, args.path, args.chunksize, args.sheet)
+        except ValueError as e:
+            print(f"GAGAL  {args.name}: {e}", file=sys.stderr)
+            return 1
+        print(f"OK     {entry['name']}: {entry['n_rows']} responden")
+    elif args.command == 'remove':
+        store.remove_wave(args.name)
+    for wave in store.waves():
+        print(f"{wave['name']:<20} {wave['n_rows']:>10} responden  {wave['filename']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -6,10 +6,25 @@
 # --- 1. Impor Library ---
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
-import numpy as np
+import os
+import functools
+import threading
+import uuid
+from contextlib import contextmanager
+
+from survey_engine import (
+    BOOTSTRAP_RESAMPLES, BOOTSTRAP_TIME_BUDGET, BRAND_IMAGE_COLUMNS, LIKERT_AVERAGE_COLUMNS,
+    PLOTLY_AVAILABLE, STREAM_CHUNKSIZE, ChartCache, DatasetStore, SurveyStats, UnsupportedFileType,
+    build_crosstab_cube, calculate_likert_average, content_digest, count_multi_response,
+    crosstab_from_cube, crosstab_intervals, dataset_digest, demo_survey, draw_crosstab_chart,
+    draw_frequency_chart, draw_likert_chart, draw_trend_chart, encode_likert, excel_sheet_names,
+    likert_average_intervals, likert_pivot_columns, load_brand_normalizer, load_survey_bytes,
+    multi_response_groups, pivot_dimension_options, pivot_label, plotly_crosstab_chart,
+    plotly_frequency_chart, plotly_likert_chart, plotly_trend_chart, render_png, stream_survey_csv,
+    value_counts_table,
+)
+from survey_perf import PerfRecorder
+from survey_waves import WaveStore, awareness_trend, cumulative_stats, likert_trend
 
 # --- 2. Konfigurasi Halaman & Desain (CSS) ---
 st.set_page_config(
@@ -76,340 +91,796 @@ st.markdown("""
 
 
 # --- 3. Fungsi-fungsi Bantuan ---
-@st.cache_data
-def load_data(uploaded_file=None):
+# Instrumentasi opsional: bila panel diagnostik aktif, setiap getter ber-cache, render grafik,
+# dan bagian laporan direkam (waktu, kenaikan memori puncak, baris, hit/miss cache).
+# Rekaman juga ditambahkan ke file JSONL jika SURVEY_PERF_LOG diisi.
+PERF_LOG_PATH = os.environ.get("SURVEY_PERF_LOG")
+
+_cache_state = threading.local()
+
+
+def get_perf_recorder():
+    """Perekam performa sesi ini, atau None jika diagnostik tidak aktif."""
+    if not st.session_state.get('perf_enabled'):
+        return None
+    return st.session_state.get('perf_recorder')
+
+
+@contextmanager
+def measure(stage, **fields):
+    """Mengukur satu tahap bila diagnostik aktif; tanpa biaya bila tidak."""
+    recorder = get_perf_recorder()
+    if recorder is None:
+        yield {}
+        return
+    with recorder.measure(stage, **fields) as record:
+        yield record
+
+
+def _row_count(args, result):
+    # Argumen pertama getter adalah dataset (DataFrame atau SurveyStats)
+    return len(args[0]) if args and isinstance(args[0], (pd.DataFrame, SurveyStats)) else None
+
+
+def instrumented_cache(stage, cache, rows=_row_count, **cache_kwargs):
+    """
+    Seperti `cache(**cache_kwargs)` (st.cache_data/st.cache_resource), tetapi setiap panggilan
+    direkam. Badan fungsi hanya berjalan saat cache miss, sehingga penanda yang dipasangnya
+    membedakan hit dan miss.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def body(*args, **kwargs):
+            _cache_state.miss = True
+            return func(*args, **kwargs)
+
+        cached = cache(**cache_kwargs)(body)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(stage) as record:
+                outer_miss = getattr(_cache_state, 'miss', False)
+                _cache_state.miss = False
+                try:
+                    result = cached(*args, **kwargs)
+                    record['cache'] = 'miss' if _cache_state.miss else 'hit'
+                    record['rows'] = rows(args, result)
+                finally:
+                    # Getter bersarang tidak boleh menghapus status miss milik pemanggilnya
+                    _cache_state.miss = outer_miss
+            return result
+
+        wrapper.clear = cached.clear
+        return wrapper
+    return decorate
+
+
+# Perhitungan ada di survey_engine; di sini hanya pembungkus cache per dataset untuk Streamlit.
+# DataFrame tidak disimpan di st.cache_data (satu salinan pickle per entri, tanpa batas ukuran),
+# melainkan di satu DatasetStore per proses: file yang sama dari banyak pengguna hanya disimpan
+# sekali dan setiap sesi menerima tampilan read-only.
+@st.cache_resource
+def get_dataset_store():
+    return DatasetStore()
+
+
+def load_data(uploaded_file=None, sheet_name=None):
     """
     Memuat data dari file yang diunggah atau menggunakan data demo jika tidak ada.
+    File yang sama (berdasarkan hash isi) dibaca dari snapshot kolumnar jika tersedia.
+    Untuk Excel hanya sheet `sheet_name` (default sheet pertama) yang dibaca.
     """
-    if uploaded_file is not None:
-        try:
-            if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            elif uploaded_file.name.endswith(('.xls', '.xlsx')):
-                df = pd.read_excel(uploaded_file)
+    store = get_dataset_store()
+    if uploaded_file is None:
+        name, digest, loader = 'demo', 'demo', demo_survey
+    else:
+        raw_bytes, name = uploaded_file.getvalue(), uploaded_file.name
+        digest = dataset_digest(raw_bytes, name, sheet_name)
+
+        def loader():
+            return load_survey_bytes(raw_bytes, name, sheet_name, digest=digest)
+    try:
+        with measure('load_data') as record:
+            record['cache'] = 'hit' if digest in store else 'miss'
+            data = store.get_or_load(digest, loader)
+            record['rows'] = len(data)
+        return data
+    except UnsupportedFileType as e:
+        st.error(str(e))
+    except Exception as e:
+        st.error(f"Gagal memuat data dari file. Error: {e}")
+    return pd.DataFrame()
+
+
+# Pemetaan ejaan merek -> nama baku dipakai bersama oleh semua sesi dan disimpan ke disk,
+# sehingga setiap ejaan baru hanya dicocokkan sekali.
+@st.cache_resource
+def get_brand_normalizer():
+    return load_brand_normalizer()
+
+
+def normalize_brands():
+    """Apakah nama merek dinormalisasi (pengaturan sidebar, default aktif)."""
+    return bool(st.session_state.get('brand_normalize', True))
+
+
+@instrumented_cache('load_stats', st.cache_data, rows=lambda args, result: len(result), max_entries=4)
+def load_stats(uploaded_file, chunksize):
+    """
+    Mode streaming: CSV diagregasi per potongan `chunksize` baris tanpa membentuk satu
+    DataFrame besar. Hasilnya SurveyStats yang dipakai semua bagian menggantikan DataFrame;
+    hitungan per ID merek ikut disimpan agar jumlah responden per merek tetap tepat.
+    """
+    try:
+        uploaded_file.seek(0)
+        stats = stream_survey_csv(uploaded_file, chunksize, get_brand_normalizer())
+    except Exception as e:
+        st.error(f"Gagal memuat data dari file. Error: {e}")
+        return SurveyStats()
+    stats.dataset_id = f"stream:{content_digest(uploaded_file.getvalue())}"
+    return stats
+
+
+@st.cache_data(max_entries=8)
+def get_sheet_names(uploaded_file):
+    """Daftar sheet workbook; isi sheet tidak dimuat."""
+    try:
+        return excel_sheet_names(uploaded_file.getvalue())
+    except Exception:
+        return []
+
+
+# Setiap getter menerima DataFrame (mode biasa) atau SurveyStats (mode streaming).
+@instrumented_cache('multi_response_groups', st.cache_data, max_entries=8)
+def get_multi_response_groups(_data, dataset_id):
+    """Kolom untuk tiap tabel multi-respon per dataset."""
+    return multi_response_groups(list(_data.columns))
+
+
+@instrumented_cache('multi_response', st.cache_data, max_entries=32)
+def get_multi_response_counts(_data, dataset_id, group, normalize):
+    """
+    Tabel frekuensi multi-respon per dataset ('top_of_mind', 'unaided_awareness', 'total_awareness').
+    SurveyStats menyimpan ejaan mentah dan dinormalisasi saat tabel dibentuk.
+    """
+    normalizer = get_brand_normalizer() if normalize else None
+    if isinstance(_data, SurveyStats):
+        return _data.multi_response_table(group, normalizer)
+    return count_multi_response(_data, get_multi_response_groups(_data, dataset_id)[group], normalizer)
+
+
+@instrumented_cache('likert_matrix', st.cache_resource, max_entries=8)
+def get_likert_matrix(_df, dataset_id):
+    """Matriks Likert per dataset, dibuat sekali dan dipakai bersama oleh semua bagian."""
+    return encode_likert(_df)
+
+
+@instrumented_cache('value_counts', st.cache_data, max_entries=64)
+def get_value_counts(_data, dataset_id, col):
+    """Tabel frekuensi jawaban satu kolom (mis. brand image Q15_*)."""
+    if isinstance(_data, SurveyStats):
+        return _data.value_counts_table(col)
+    if col not in _data.columns:
+        return pd.DataFrame(columns=['Respons', 'Frekuensi'])
+    return value_counts_table(_data, col)
+
+
+@instrumented_cache('likert_average', st.cache_data, max_entries=32)
+def get_likert_average(_data, dataset_id, cols):
+    """Rata-rata Likert per dataset dan kelompok kolom."""
+    if isinstance(_data, SurveyStats):
+        return _data.likert_average(list(cols))
+    return calculate_likert_average(get_likert_matrix(_data, dataset_id), list(cols))
+
+
+@instrumented_cache('crosstab_cube', st.cache_resource, max_entries=8)
+def get_crosstab_cube(_data, dataset_id):
+    """Kubus tabel silang per dataset."""
+    if isinstance(_data, SurveyStats):
+        return _data.cube
+    return build_crosstab_cube(_data, get_likert_matrix(_data, dataset_id))
+
+
+# Interval kepercayaan bootstrap (opsional, diatur di sidebar). `settings` adalah tuple
+# (tingkat kepercayaan, jumlah resample, batas waktu detik) agar ikut menjadi kunci cache.
+def bootstrap_settings():
+    """Pengaturan bootstrap dari sidebar, atau None jika interval kepercayaan tidak aktif."""
+    if not st.session_state.get('ci_enabled'):
+        return None
+    return (
+        st.session_state.get('ci_confidence', 0.95),
+        int(st.session_state.get('ci_resamples', BOOTSTRAP_RESAMPLES)),
+        float(st.session_state.get('ci_seconds', BOOTSTRAP_TIME_BUDGET)),
+    )
+
+
+@instrumented_cache('likert_intervals', st.cache_data, max_entries=32)
+def get_likert_intervals(_data, dataset_id, cols, settings):
+    """Rata-rata Likert dengan interval kepercayaan bootstrap per dataset dan kelompok kolom."""
+    return likert_average_intervals(get_crosstab_cube(_data, dataset_id), list(cols), *settings)
+
+
+@instrumented_cache('crosstab_intervals', st.cache_data, max_entries=32)
+def get_crosstab_intervals(_data, dataset_id, pivot_dims, cols, settings):
+    """Interval kepercayaan dan penanda signifikansi untuk setiap sel tabel silang."""
+    return crosstab_intervals(get_crosstab_cube(_data, dataset_id), pivot_dims, list(cols), *settings)
+
+
+def likert_table(data, dataset_id, category, averages):
+    """Tabel rata-rata satu kategori Likert; dengan kolom interval jika bootstrap aktif."""
+    settings = bootstrap_settings()
+    if settings is None or averages.empty:
+        return averages
+    intervals = get_likert_intervals(data, dataset_id, tuple(LIKERT_AVERAGE_COLUMNS[category]), settings)
+    return averages if intervals is None else intervals
+
+
+# Mode gelombang: statistik tiap gelombang dimuat dari penyimpanan lokal; `waves` adalah tuple
+# (nama, digest) sehingga menambah/mengganti gelombang otomatis menjadi kunci cache baru.
+@st.cache_resource
+def get_wave_store():
+    return WaveStore(normalizer=get_brand_normalizer())
+
+
+@instrumented_cache('wave_stats', st.cache_resource, rows=lambda args, result: sum(map(len, result.values())),
+                    max_entries=8)
+def get_wave_stats(_store, waves):
+    """dict nama gelombang -> SurveyStats tersimpan."""
+    return {name: _store.load_stats(digest) for name, digest in waves}
+
+
+@instrumented_cache('wave_cumulative', st.cache_resource, rows=lambda args, result: len(result), max_entries=8)
+def get_cumulative_stats(_store, waves):
+    """Statistik gabungan gelombang terpilih, tanpa membaca ulang file mentah."""
+    return cumulative_stats(get_wave_stats(_store, waves))
+
+
+# Cache render grafik: PNG disimpan per (dataset, bagian, parameter) sehingga membuka ulang
+# bagian laporan atau mengembalikan pilihan selectbox tidak perlu menggambar ulang.
+CHART_CACHE_MAX_BYTES = int(os.environ.get("SURVEY_CHART_CACHE_MB", "128")) * 1024 * 1024
+
+
+@st.cache_resource
+def get_chart_cache():
+    return ChartCache(CHART_CACHE_MAX_BYTES)
+
+
+def render_chart(key, draw, figsize):
+    """Mengembalikan PNG grafik untuk `key`; `draw(ax)` hanya dipanggil jika belum ada di cache."""
+    cache = get_chart_cache()
+    with measure(f"chart:{key[1]}") as record:
+        png = cache.get(key)
+        record['cache'] = 'miss' if png is None else 'hit'
+        if png is None:
+            png = render_png(draw, figsize)
+            cache.put(key, png)
+    return png
+
+
+# Backend grafik: Plotly mengirim tabel agregat kecil ke browser dan menggambarnya di sisi klien
+# (hover/zoom/legenda tanpa rerun); Matplotlib merender PNG ber-cache di server.
+PLOTLY_BACKEND = "Interaktif (Plotly)"
+MATPLOTLIB_BACKEND = "Gambar (Matplotlib)"
+CHART_BACKENDS = [PLOTLY_BACKEND, MATPLOTLIB_BACKEND] if PLOTLY_AVAILABLE else [MATPLOTLIB_BACKEND]
+CHART_BUILDERS = {
+    'frequency': (draw_frequency_chart, plotly_frequency_chart),
+    'likert': (draw_likert_chart, plotly_likert_chart),
+    'crosstab': (draw_crosstab_chart, plotly_crosstab_chart),
+    'trend': (draw_trend_chart, plotly_trend_chart),
+}
+# Batas jumlah batang per grafik frekuensi, agar payload tetap kecil untuk jawaban berkardinalitas tinggi
+CHART_MAX_CATEGORIES = int(os.environ.get("SURVEY_CHART_MAX_CATEGORIES", "50"))
+
+popover = getattr(st, 'popover', None) or st.expander
+
+
+def show_chart(key, kind, figsize, *args, **kwargs):
+    """
+    Menampilkan grafik `kind` ('frequency', 'likert', 'crosstab', 'trend') dengan backend yang
+    dipilih di sidebar. `args`/`kwargs` diteruskan ke draw_* atau plotly_*_chart yang sesuai.
+    """
+    draw, build = CHART_BUILDERS[kind]
+    if st.session_state.get('chart_backend', CHART_BACKENDS[0]) != PLOTLY_BACKEND:
+        st.image(render_chart(key, lambda ax: draw(ax, *args, **kwargs), figsize))
+        return
+    with measure(f"chart:{key[1]}") as record:
+        figure = build(*args, **kwargs)
+        if get_perf_recorder() is not None:
+            record['payload_kb'] = round(len(figure.to_json()) / 1024, 1)
+    st.plotly_chart(figure, use_container_width=True, key='chart:' + ':'.join(map(str, key)))
+
+
+FREQUENCY_SORTS = ["Frekuensi terbanyak", "Frekuensi tersedikit", "Nama (A-Z)"]
+
+
+def frequency_chart_view(key, table, label_col):
+    """
+    Urutan, filter, dan top-N untuk satu grafik frekuensi. Hanya tabel agregat (satu baris per
+    merek/jawaban) yang diolah, jadi mengubah pilihan tidak menyentuh data responden.
+    Mengembalikan tabel untuk grafik dan tuple pilihan (bagian dari kunci cache grafik).
+    """
+    with popover("⚙️ Atur grafik"):
+        order = st.selectbox("Urutkan", FREQUENCY_SORTS, key=f"{key}:sort")
+        selected = st.multiselect(
+            f"Hanya tampilkan {label_col.lower()}", options=table[label_col].astype(str).tolist(), key=f"{key}:filter"
+        )
+        top_n = st.number_input(
+            "Jumlah teratas", min_value=1, max_value=CHART_MAX_CATEGORIES,
+            value=min(20, CHART_MAX_CATEGORIES), key=f"{key}:top"
+        )
+
+    view = table
+    if selected:
+        view = view[view[label_col].astype(str).isin(selected)]
+    view = view.sort_values('Frekuensi', ascending=False, kind='stable').head(int(top_n))
+    if order == "Frekuensi tersedikit":
+        view = view.iloc[::-1]
+    elif order == "Nama (A-Z)":
+        view = view.sort_values(label_col, key=lambda labels: labels.astype(str), kind='stable')
+    return view, (order, tuple(selected), int(top_n))
+
+
+def render_brand_variants(table):
+    """Daftar ejaan merek yang digabung ke nama bakunya pada satu tabel multi-respon."""
+    approximate = table.attrs.get('approximate_reach')
+    if approximate:
+        st.caption(
+            f"Jumlah responden untuk {', '.join(map(str, approximate))} tidak dapat dihitung tepat "
+            "dari statistik tersimpan (ejaan digabung setelah diagregasi) sehingga dikosongkan."
+        )
+    variants = table.attrs.get('brand_variants')
+    if not variants:
+        return
+    rows = [(spelling, brand) for brand, spellings in variants.items() for spelling in spellings]
+    with st.expander(f"🏷️ {len(rows)} ejaan digabung ke {len(variants)} nama merek"):
+        st.dataframe(pd.DataFrame(rows, columns=['Ejaan', 'Restoran']), use_container_width=True, hide_index=True)
+
+
+def render_dataset_store_panel(store):
+    """Okupansi DatasetStore bersama (semua sesi dalam proses ini)."""
+    occupancy = store.occupancy()
+    with st.sidebar.expander("💾 Penyimpanan Dataset"):
+        used_mb, max_mb = occupancy['bytes'] / 1024 / 1024, occupancy['max_bytes'] / 1024 / 1024
+        st.progress(
+            min(occupancy['bytes'] / occupancy['max_bytes'], 1.0) if occupancy['max_bytes'] else 1.0,
+            text=f"{used_mb:.1f} / {max_mb:.0f} MB ({occupancy['datasets']} dataset)"
+        )
+        st.caption(f"{occupancy['hits']} hit, {occupancy['misses']} dimuat, {occupancy['evictions']} digusur")
+        if occupancy['entries']:
+            entries = pd.DataFrame(occupancy['entries'])
+            entries['MB'] = (entries.pop('bytes') / 1024 / 1024).round(2)
+            st.dataframe(entries, use_container_width=True, hide_index=True)
+
+
+def render_perf_panel(recorder):
+    """Panel diagnostik di sidebar: rekaman rerun terakhir dan unduhan JSON/JSONL."""
+    with st.sidebar.expander("🩺 Diagnostik Performa", expanded=True):
+        records = recorder.run_records()
+        if not records:
+            st.caption("Belum ada rekaman untuk rerun ini.")
+            return
+        table = pd.DataFrame(records)
+        cache_calls = table['cache'].dropna()
+        st.metric("Total waktu rerun (detik)", f"{table.loc[table['depth'] == 0, 'seconds'].sum():.3f}")
+        st.caption(f"Cache: {(cache_calls == 'hit').sum()} hit, {(cache_calls == 'miss').sum()} miss")
+        # Tahap bersarang diberi indentasi agar terlihat bagian dari tahap mana
+        table['stage'] = ['  ' * depth + stage for depth, stage in zip(table['depth'], table['stage'])]
+        st.dataframe(
+            table.reindex(columns=['stage', 'seconds', 'peak_mb', 'rows', 'cache', 'payload_kb']).dropna(axis=1, how='all'),
+            use_container_width=True, hide_index=True
+        )
+        st.download_button(
+            "Unduh JSON (sesi)", recorder.to_json(), file_name='diagnostik_performa.json',
+            mime='application/json'
+        )
+        st.download_button(
+            "Unduh JSONL (sesi)", recorder.to_jsonl(), file_name='diagnostik_performa.jsonl',
+            mime='application/x-ndjson'
+        )
+
+
+# --- 4. Bagian-bagian Dashboard ---
+# Setiap bagian adalah fragment: interaksi widget di dalamnya hanya menjalankan ulang bagian
+# itu, dan hanya bagian yang dipilih di sidebar yang dihitung pada setiap rerun.
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+
+@fragment
+def render_awareness_section(data, dataset_id):
+    """Top of mind dan unaided awareness (Q1_1, Q2_*)."""
+    normalize = normalize_brands()
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("Frekuensi Top of Mind (Q1_1)")
+        if 'Q1_1' in data.columns:
+            q1_freq = get_multi_response_counts(data, dataset_id, 'top_of_mind', normalize).drop(columns='Responden')
+            q1_freq['Persentase'] = (q1_freq['Frekuensi'] / len(data) * 100).round(2)
+            st.dataframe(q1_freq, use_container_width=True)
+            render_brand_variants(q1_freq)
+
+            view, options = frequency_chart_view(f"{dataset_id}:top_of_mind", q1_freq, 'Restoran')
+            show_chart(
+                (dataset_id, 'top_of_mind', normalize, options), 'frequency', (10, 6),
+                view, 'Restoran', 'viridis', 'Top of Mind Frequency'
+            )
+        else:
+            st.info("Kolom Q1_1 tidak ditemukan.")
+
+    with col2:
+        st.subheader("Frekuensi Unaided Awareness (Q1_1, Q2_1 - Q2_5)")
+        if get_multi_response_groups(data, dataset_id)['unaided_awareness']:
+            unaided_freq = get_multi_response_counts(data, dataset_id, 'unaided_awareness', normalize)
+
+            if not unaided_freq.empty:
+                unaided_freq['Persentase'] = (unaided_freq['Responden'] / len(data) * 100).round(2)
+                st.dataframe(unaided_freq, use_container_width=True)
+                render_brand_variants(unaided_freq)
+
+                view, options = frequency_chart_view(f"{dataset_id}:unaided", unaided_freq, 'Restoran')
+                show_chart(
+                    (dataset_id, 'unaided', normalize, options), 'frequency', (10, 6),
+                    view, 'Restoran', 'magma', 'Unaided Awareness Frequency'
+                )
             else:
-                st.error("Tipe file tidak didukung. Unggah file CSV atau Excel.")
-                return pd.DataFrame()
-            return df
-        except Exception as e:
-            st.error(f"Gagal memuat data dari file. Error: {e}")
-            return pd.DataFrame()
+                st.info("Tidak ada data untuk unaided awareness.")
+        else:
+            st.info("Kolom untuk unaided awareness tidak ditemukan.")
+
+
+@fragment
+def render_total_awareness_section(data, dataset_id):
+    """Total awareness (Q3_*)."""
+    st.subheader("Frekuensi Total Awareness (Q3_1 - Q3_9)")
+    normalize = normalize_brands()
+    if get_multi_response_groups(data, dataset_id)['total_awareness']:
+        total_awareness_freq = get_multi_response_counts(data, dataset_id, 'total_awareness', normalize)
+        if not total_awareness_freq.empty:
+            total_awareness_freq['Persentase'] = (total_awareness_freq['Responden'] / len(data) * 100).round(2)
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.dataframe(total_awareness_freq, use_container_width=True)
+                render_brand_variants(total_awareness_freq)
+            with col2:
+                view, options = frequency_chart_view(
+                    f"{dataset_id}:total_awareness", total_awareness_freq, 'Restoran'
+                )
+                show_chart(
+                    (dataset_id, 'total_awareness', normalize, options), 'frequency', (10, 6),
+                    view, 'Restoran', 'plasma', 'Total Awareness Frequency'
+                )
+        else:
+            st.info("Tidak ada data untuk total awareness.")
     else:
-        # Data demo yang lebih bervariasi agar visualisasi menarik
-        cols = ['S1', 'S2', 'S3', 'Q1_1', 'Q2_1', 'Q2_2', 'Q2_3', 'Q3_1', 'Q3_2', 'Q3_3', 'Q3_4', 'Q3_5', 
-                'Q15_1', 'Q15_2', 'Q15_3', 'Q15_4', 'Q15_5', 'Q15_6', 'Q15_7', 'Q15_8', 
-                'Q16_1', 'Q16_2', 'Q16_3', 'Q16_4', 'Q17_1', 'Q17_2', 'Q17_3', 'Q18', 
-                'Q19_1', 'Q19_2', 'Q19_3', 'Q19_4', 'Q19_5', 
-                'Q20_1', 'Q20_2', 'Q20_3', 'Q20_4', 'Q21_1', 'Q21_2', 'Q21_3', 'Q23', 
-                'Q24_1', 'Q24_2', 'Q24_3', 'Q24_4', 'Q24_5',
-                'Q25_1', 'Q25_2', 'Q26_1', 'Q26_2', 'Q26_3', 'Q26_4', 'Q27_1', 'Q27_2', 'Q27_3', 'Q28_1', 'Q28_2']
-        
-        data = {
-            'S1': ['Laki-laki', 'Perempuan'] * 50,
-            'S2': ['45 - 49 tahun', '25 - 29 tahun', '30 - 34 tahun', '20 - 24 tahun', '40 - 44 tahun'] * 20,
-            'S3': ['Menikah - punya anak', 'Belum menikah'] * 50,
-            'Q1_1': ['KFC', 'McD', 'HokBen', 'KFC', 'Pizza Hut'] * 20,
-            'Q2_1': ['Burger King', np.nan, 'Burger King', np.nan, 'Burger King'] * 20,
-            'Q2_2': ['Solaria', 'Solaria', np.nan, 'Solaria', np.nan] * 20,
-            'Q2_3': [np.nan, 'Sate Khas Senayan', 'Sate Khas Senayan', np.nan, 'Sate Khas Senayan'] * 20,
-            'Q3_1': ['KFC'] * 100,
-            'Q3_2': ['McD'] * 100,
-            'Q3_3': ['Pizza Hut'] * 100,
-            'Q3_4': ['HokBen'] * 100,
-            'Q3_5': ['Solaria'] * 100,
-            'Q15_1': ['Sangat Setuju', 'Setuju', 'Sangat Setuju', 'Netral', 'Setuju'] * 20,
-            'Q15_2': ['Setuju', 'Sangat Tidak Setuju', 'Netral', 'Setuju', 'Tidak Setuju'] * 20,
-            'Q15_3': ['Sangat Setuju', 'Sangat Setuju', 'Netral', 'Sangat Setuju', 'Netral'] * 20,
-            'Q15_4': ['Setuju', 'Netral', 'Sangat Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
-            'Q15_5': ['Setuju', 'Tidak Setuju', 'Netral', 'Setuju', 'Setuju'] * 20,
-            'Q15_6': ['Sangat Setuju', 'Setuju', 'Sangat Tidak Setuju', 'Setuju', 'Netral'] * 20,
-            'Q15_7': ['Setuju', 'Sangat Setuju', 'Setuju', 'Tidak Setuju', 'Sangat Setuju'] * 20,
-            'Q15_8': ['Tidak Setuju', 'Netral', 'Sangat Setuju', 'Tidak Setuju', 'Netral'] * 20,
-            'Q16_1': ['Sangat Penting', 'Penting', 'Sangat Penting', 'Netral', 'Penting'] * 20,
-            'Q16_2': ['Penting', 'Sangat Tidak Penting', 'Netral', 'Penting', 'Tidak Penting'] * 20,
-            'Q16_3': ['Sangat Penting', 'Sangat Penting', 'Netral', 'Sangat Penting', 'Netral'] * 20,
-            'Q16_4': ['Penting', 'Netral', 'Sangat Penting', 'Penting', 'Sangat Tidak Penting'] * 20,
-            'Q17_1': ['Sangat Penting', 'Tidak Penting', 'Netral', 'Sangat Penting', 'Penting'] * 20,
-            'Q17_2': ['Penting', 'Sangat Penting', 'Penting', 'Tidak Penting', 'Sangat Penting'] * 20,
-            'Q17_3': ['Sangat Tidak Penting', 'Netral', 'Sangat Penting', 'Tidak Penting', 'Netral'] * 20,
-            'Q18': ['Sangat Penting', 'Penting', 'Netral', 'Tidak Penting', 'Sangat Tidak Penting'] * 20,
-            'Q19_1': ['Sangat Penting', 'Penting', 'Sangat Penting', 'Netral', 'Penting'] * 20,
-            'Q19_2': ['Penting', 'Sangat Tidak Penting', 'Netral', 'Penting', 'Tidak Penting'] * 20,
-            'Q19_3': ['Sangat Penting', 'Sangat Penting', 'Netral', 'Sangat Penting', 'Netral'] * 20,
-            'Q19_4': ['Penting', 'Netral', 'Sangat Penting', 'Penting', 'Sangat Tidak Penting'] * 20,
-            'Q19_5': ['Sangat Penting', 'Tidak Penting', 'Netral', 'Sangat Penting', 'Penting'] * 20,
-            'Q20_1': ['Sangat Puas', 'Puas', 'Netral', 'Puas', 'Sangat Tidak Puas'] * 20,
-            'Q20_2': ['Puas', 'Tidak Puas', 'Sangat Puas', 'Puas', 'Netral'] * 20,
-            'Q20_3': ['Sangat Puas', 'Netral', 'Tidak Puas', 'Sangat Puas', 'Netral'] * 20,
-            'Q20_4': ['Tidak Puas', 'Netral', 'Sangat Puas', 'Tidak Puas', 'Netral'] * 20,
-            'Q21_1': ['Puas', 'Sangat Puas', 'Puas', 'Tidak Puas', 'Sangat Puas'] * 20,
-            'Q21_2': ['Sangat Tidak Puas', 'Tidak Puas', 'Sangat Puas', 'Tidak Puas', 'Netral'] * 20,
-            'Q21_3': ['Sangat Puas', 'Puas', 'Netral', 'Sangat Puas', 'Puas'] * 20,
-            'Q23': [1, 2, 3, 4, 5] * 20,
-            'Q24_1': ['Sangat Puas', 'Puas', 'Netral', 'Tidak Puas', 'Sangat Tidak Puas'] * 20,
-            'Q24_2': ['Sangat Puas', 'Netral', 'Sangat Tidak Puas', 'Puas', 'Netral'] * 20,
-            'Q24_3': ['Puas', 'Sangat Puas', 'Puas', 'Sangat Tidak Puas', 'Tidak Puas'] * 20,
-            'Q24_4': ['Netral', 'Tidak Puas', 'Sangat Puas', 'Netral', 'Sangat Puas'] * 20,
-            'Q24_5': ['Puas', 'Netral', 'Puas', 'Tidak Puas', 'Sangat Tidak Puas'] * 20,
-            'Q25_1': ['Sangat Setuju', 'Netral', 'Setuju', 'Sangat Setuju', 'Netral'] * 20,
-            'Q25_2': ['Setuju', 'Sangat Setuju', 'Netral', 'Sangat Tidak Setuju', 'Setuju'] * 20,
-            'Q26_1': ['Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
-            'Q26_2': ['Setuju', 'Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju'] * 20,
-            'Q26_3': ['Sangat Setuju', 'Netral', 'Setuju', 'Sangat Setuju', 'Netral'] * 20,
-            'Q26_4': ['Setuju', 'Setuju', 'Sangat Setuju', 'Netral', 'Setuju'] * 20,
-            'Q27_1': ['Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
-            'Q27_2': ['Sangat Setuju', 'Netral', 'Setuju', 'Sangat Setuju', 'Netral'] * 20,
-            'Q27_3': ['Setuju', 'Sangat Setuju', 'Netral', 'Sangat Tidak Setuju', 'Setuju'] * 20,
-            'Q28_1': ['Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju', 'Sangat Tidak Setuju'] * 20,
-            'Q28_2': ['Setuju', 'Sangat Setuju', 'Netral', 'Tidak Setuju', 'Setuju'] * 20,
-        }
-        
-        df = pd.DataFrame(data)
-        # Menambahkan kolom kosong agar sesuai dengan template awal
-        for col in cols:
-            if col not in df.columns:
-                df[col] = np.nan
-        
-        return df[cols]
-
-def process_multi_response(df, prefix_list):
-    """Menggabungkan kolom-kolom multi-respon menjadi satu seri."""
-    responses = pd.Series(dtype='object')
-    for col_prefix in prefix_list:
-        cols_to_combine = [col for col in df.columns if col.startswith(col_prefix) and '_' in col]
-        if not cols_to_combine:
-            continue
-        combined_series = df[cols_to_combine].stack().dropna().reset_index(drop=True)
-        responses = pd.concat([responses, combined_series], ignore_index=True)
-    return responses
-
-def calculate_likert_average(df, col_list):
-    """Menghitung rata-rata skor untuk pertanyaan skala Likert."""
-    mapping = {
-        'Sangat Tidak Setuju': 1, 'Tidak Setuju': 2, 'Netral': 3, 'Setuju': 4, 'Sangat Setuju': 5,
-        'Sangat Tidak Penting': 1, 'Tidak Penting': 2, 'Netral': 3, 'Penting': 4, 'Sangat Penting': 5,
-        'Sangat Tidak Puas': 1, 'Tidak Puas': 2, 'Netral': 3, 'Puas': 4, 'Sangat Puas': 5
-    }
-    averages = {}
-    existing_cols = [col for col in col_list if col in df.columns]
-    
-    for col in existing_cols:
-        series = df[col].map(mapping)
-        if not series.isnull().all():
-            averages[col] = series.mean()
-    return pd.DataFrame.from_dict(averages, orient='index', columns=['Rata-rata']).sort_index()
-
-# --- 4. Logika Utama Aplikasi ---
+        st.info("Kolom untuk total awareness tidak ditemukan.")
+
+
+@fragment
+def render_brand_image_section(data, dataset_id):
+    """Distribusi jawaban brand image (Q15_1 - Q15_8)."""
+    st.subheader("Frekuensi Brand Image (Q15_1 - Q15_8)")
+    for col in BRAND_IMAGE_COLUMNS:
+        freq_data = get_value_counts(data, dataset_id, col)
+        if not freq_data.empty:
+            st.markdown(f"**{col}:**")
+
+            col1, col2 = st.columns(2)
+            with col1:
+                st.dataframe(freq_data, use_container_width=True)
+            with col2:
+                view, options = frequency_chart_view(f"{dataset_id}:brand_image:{col}", freq_data, 'Respons')
+                show_chart(
+                    (dataset_id, 'brand_image', col, options), 'frequency', (8, 5),
+                    view, 'Respons', 'coolwarm', f'Frekuensi {col}', title_size=14
+                )
+        else:
+            st.info(f"Tidak ada data untuk kolom {col}.")
+
+
+@fragment
+def render_likert_section(data, dataset_id):
+    """Rata-rata skala Likert per kategori."""
+    st.subheader("Visualisasi Rata-rata Likert")
+    col1, col2, col3 = st.columns(3)
+
+    # Tingkat Kepentingan (Q16_1 - Q19_5)
+    with col1:
+        st.subheader("1. Tingkat Kepentingan")
+        importance_avg = get_likert_average(data, dataset_id, tuple(LIKERT_AVERAGE_COLUMNS["Tingkat Kepentingan"]))
+        if not importance_avg.empty:
+            st.dataframe(
+                likert_table(data, dataset_id, "Tingkat Kepentingan", importance_avg)
+                .style.background_gradient(cmap='YlGnBu', subset=['Rata-rata']).format(precision=2),
+                use_container_width=True
+            )
+        else:
+            st.info("Tidak ada data untuk tingkat kepentingan.")
+
+    # Tingkat Kepuasan (Q20_1 - Q24_5)
+    with col2:
+        st.subheader("2. Tingkat Kepuasan")
+        satisfaction_avg = get_likert_average(data, dataset_id, tuple(LIKERT_AVERAGE_COLUMNS["Tingkat Kepuasan"]))
+        if not satisfaction_avg.empty:
+            st.dataframe(
+                likert_table(data, dataset_id, "Tingkat Kepuasan", satisfaction_avg)
+                .style.background_gradient(cmap='YlOrRd', subset=['Rata-rata']).format(precision=2),
+                use_container_width=True
+            )
+        else:
+            st.info("Tidak ada data untuk tingkat kepuasan.")
+
+    # Tingkat Persesuaian (Q25_1 - Q28_2)
+    with col3:
+        st.subheader("3. Tingkat Persesuaian")
+        agreement_avg = get_likert_average(data, dataset_id, tuple(LIKERT_AVERAGE_COLUMNS["Tingkat Persesuaian"]))
+        if not agreement_avg.empty:
+            st.dataframe(
+                likert_table(data, dataset_id, "Tingkat Persesuaian", agreement_avg)
+                .style.background_gradient(cmap='PuBu', subset=['Rata-rata']).format(precision=2),
+                use_container_width=True
+            )
+        else:
+            st.info("Tidak ada data untuk tingkat persesuaian.")
+
+    settings = bootstrap_settings()
+    if settings is not None:
+        st.caption(
+            f"Batas Bawah/Atas: interval kepercayaan {settings[0]:.0%} (bootstrap persentil), "
+            f"n = jumlah jawaban valid."
+        )
+
+    if not importance_avg.empty or not satisfaction_avg.empty or not agreement_avg.empty:
+        st.subheader("Visualisasi Rata-rata Likert")
+        averages = [importance_avg, satisfaction_avg, agreement_avg]
+        show_chart((dataset_id, 'likert_averages'), 'likert', (15, 8), averages, list(LIKERT_AVERAGE_COLUMNS))
+    else:
+        st.info("Tidak ada data Likert yang tersedia untuk visualisasi.")
+
+
+@fragment
+def render_crosstab_section(data, dataset_id):
+    """Tabel silang Likert berdasarkan parameter pivot."""
+    cube = get_crosstab_cube(data, dataset_id)
+    st.subheader("Tabel Silang (Crosstab)")
+    st.write("Pilih 2 parameter untuk membuat tabel silang. Data yang akan digunakan adalah dari Skala Likert.")
+
+    if not cube.columns:
+        st.info("Tidak ada kolom Likert yang ditemukan untuk analisis ini.")
+    else:
+        likert_options = list(LIKERT_AVERAGE_COLUMNS)
+        pivot_options = pivot_dimension_options(cube)
+
+        selected_likert = st.selectbox("Pilih Tipe Analisis:", options=likert_options)
+        selected_pivot_dims = st.selectbox(
+            "Pilih Parameter Pivot:", options=pivot_options,
+            format_func=pivot_label
+        )
+        cols_to_pivot = likert_pivot_columns(cube, selected_likert)
+
+        if selected_pivot_dims and cols_to_pivot:
+            selected_pivot = pivot_label(selected_pivot_dims)
+            with measure('crosstab_pivot', rows=len(data)):
+                pivot_table = crosstab_from_cube(cube, selected_pivot_dims, cols_to_pivot)
+
+            settings = bootstrap_settings()
+            intervals = None
+            if settings is not None:
+                intervals = get_crosstab_intervals(
+                    data, dataset_id, selected_pivot_dims, tuple(cols_to_pivot), settings
+                )
+
+            if intervals is None:
+                st.dataframe(pivot_table.style.background_gradient(cmap='viridis', axis=None).format(precision=2), use_container_width=True)
+                if settings is not None:
+                    st.caption("Interval kepercayaan tidak tersedia untuk data ini.")
+            else:
+                # Sel ditampilkan sebagai "rata-rata [bawah, atas]"; warna tetap mengikuti rata-rata
+                def cell_text(frame, formatter):
+                    return frame.apply(lambda column: column.map(formatter))
+
+                cells = (
+                    cell_text(pivot_table, '{:.2f}'.format) + cell_text(intervals.lower, ' [{:.2f}'.format)
+                    + cell_text(intervals.upper, ', {:.2f}]'.format)
+                    + cell_text(intervals.significant, {True: ' *', False: ''}.get)
+                )
+                st.dataframe(
+                    cells.style.background_gradient(cmap='viridis', axis=None, gmap=pivot_table),
+                    use_container_width=True
+                )
+                st.caption(
+                    f"[bawah, atas]: interval kepercayaan {settings[0]:.0%} dari {intervals.n_resamples} resample bootstrap. "
+                    "* = berbeda signifikan dari gabungan kelompok lain pada pertanyaan yang sama."
+                )
+
+            title = f'Tabel Silang {selected_likert} berdasarkan {selected_pivot}'
+            show_chart(
+                (dataset_id, 'crosstab', selected_likert, selected_pivot_dims, settings), 'crosstab', (15, 8),
+                pivot_table, title,
+                *((intervals.lower, intervals.upper) if intervals is not None else ())
+            )
+        else:
+            st.info("Kolom yang dipilih tidak ditemukan dalam data.")
+
+
+AWARENESS_TREND_TABLES = {
+    'top_of_mind': 'Top of Mind', 'unaided_awareness': 'Unaided Awareness', 'total_awareness': 'Total Awareness',
+}
+
+
+@fragment
+def render_trend_section(data, dataset_id, stats_by_wave):
+    """Perbandingan antar gelombang: awareness merek dan rata-rata Likert per gelombang."""
+    st.subheader("Ringkasan Gelombang")
+    st.dataframe(
+        pd.DataFrame({'Gelombang': list(stats_by_wave), 'Responden': [len(stats) for stats in stats_by_wave.values()]}),
+        hide_index=True
+    )
+    if len(stats_by_wave) < 2:
+        st.info("Pilih minimal dua gelombang untuk melihat tren.")
+        return
+    wave_names = tuple(stats_by_wave)
+
+    st.subheader("Tren Awareness Merek")
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        table_name = st.selectbox(
+            "Pilih jenis awareness:", options=list(AWARENESS_TREND_TABLES), format_func=AWARENESS_TREND_TABLES.get
+        )
+    with col2:
+        top_n = st.number_input("Jumlah merek teratas", min_value=1, max_value=30, value=8)
+    normalize = normalize_brands()
+    with measure('awareness_trend', rows=len(data)):
+        trend = awareness_trend(
+            stats_by_wave, table_name, get_brand_normalizer() if normalize else None
+        ).head(int(top_n))
+    if trend.empty:
+        st.info("Tidak ada data awareness pada gelombang terpilih.")
+    else:
+        st.dataframe(trend.style.format(precision=2, na_rep='–'), use_container_width=True)
+        if trend.isna().any().any():
+            st.caption("– : jumlah responden merek ini tidak dapat dihitung tepat pada gelombang tersebut.")
+        title = f"Tren {AWARENESS_TREND_TABLES[table_name]} (% Responden)"
+        show_chart(
+            (dataset_id, 'trend_awareness', wave_names, table_name, normalize, int(top_n)), 'trend', (12, 6),
+            trend, title, 'Persentase (%)'
+        )
+
+    st.subheader("Tren Rata-rata Likert")
+    category = st.selectbox("Pilih kategori Likert:", options=list(LIKERT_AVERAGE_COLUMNS))
+    likert_table = likert_trend(stats_by_wave, LIKERT_AVERAGE_COLUMNS[category])
+    if likert_table.empty:
+        st.info("Tidak ada data Likert pada gelombang terpilih.")
+    else:
+        st.dataframe(likert_table.style.background_gradient(cmap='YlGnBu', axis=None).format(precision=2),
+                     use_container_width=True)
+        show_chart(
+            (dataset_id, 'trend_likert', wave_names, category), 'trend', (12, 6),
+            likert_table, f"Tren {category}", 'Rata-rata Skor'
+        )
+
+
+TREND_SECTION = "📉 Tren per Gelombang"
+
+SECTIONS = {
+    "📊 Frekuensi & Persentase (Top of Mind & Unaided)": render_awareness_section,
+    "📈 Total Awareness": render_total_awareness_section,
+    "🖼️ Brand Image": render_brand_image_section,
+    "📊 Rata-rata Skala Likert": render_likert_section,
+    "🗺️ Pemetaan Konseptual (Tabel Silang)": render_crosstab_section,
+}
+
+# --- 5. Logika Utama Aplikasi ---
 st.sidebar.title("Opsi Data")
 uploaded_file = st.sidebar.file_uploader("Unggah file survei Anda (CSV atau XLSX)", type=['csv', 'xlsx'])
 
-df = load_data(uploaded_file)
+sheet_name = None
+if uploaded_file is not None and uploaded_file.name.endswith('.xlsx'):
+    sheet_names = get_sheet_names(uploaded_file)
+    if len(sheet_names) > 1:
+        sheet_name = st.sidebar.selectbox("Pilih sheet", options=sheet_names)
+
+if st.sidebar.checkbox("Diagnostik performa", key='perf_enabled'):
+    if 'perf_recorder' not in st.session_state:
+        st.session_state['perf_recorder'] = PerfRecorder(session_id=uuid.uuid4().hex)
+    st.session_state['perf_recorder'].trace_memory = st.sidebar.checkbox(
+        "Lacak memori puncak (tracemalloc)", value=True,
+        help="Memperlambat alokasi; matikan untuk waktu yang lebih akurat."
+    )
+    st.session_state['perf_recorder'].start_run()
+elif 'perf_recorder' in st.session_state:
+    # tracemalloc berlaku untuk seluruh proses: lepaskan agar sesi lain tidak ikut melambat
+    st.session_state['perf_recorder'].stop()
+
+with st.sidebar.expander("📏 Interval Kepercayaan"):
+    if st.checkbox("Tampilkan interval kepercayaan (bootstrap)", key='ci_enabled'):
+        st.select_slider(
+            "Tingkat kepercayaan", options=[0.90, 0.95, 0.99], value=0.95, format_func='{:.0%}'.format,
+            key='ci_confidence'
+        )
+        st.number_input("Jumlah resample", min_value=100, max_value=20_000, value=BOOTSTRAP_RESAMPLES,
+                        step=500, key='ci_resamples')
+        st.number_input(
+            "Batas waktu (detik)", min_value=0.1, max_value=10.0, value=BOOTSTRAP_TIME_BUDGET, step=0.1,
+            key='ci_seconds', help="Resample dihentikan lebih awal bila batas waktu terlampaui."
+        )
+
+st.sidebar.radio(
+    "Tampilan grafik", options=CHART_BACKENDS, key='chart_backend',
+    help="Plotly: interaktif dan dirender di browser. Matplotlib: gambar PNG dari server."
+)
+
+st.sidebar.checkbox(
+    "Normalisasi nama merek", value=True, key='brand_normalize',
+    help="Gabungkan ejaan merek yang berbeda (mis. \"McDonald's\", \"mcd \") ke satu nama baku "
+         "lewat kamus alias dan pencocokan fuzzy."
+)
+
+wave_mode = st.sidebar.checkbox(
+    "Mode gelombang (inkremental)",
+    help="Simpan ringkasan setiap gelombang survei; laporan digabung dari ringkasan tanpa membaca ulang file lama."
+)
+stats_by_wave = None
+if wave_mode:
+    store = get_wave_store()
+    if uploaded_file is not None:
+        wave_name = st.sidebar.text_input("Nama gelombang", value=os.path.splitext(uploaded_file.name)[0])
+        if st.sidebar.button("Simpan sebagai gelombang") and wave_name:
+            try:
+                with measure('wave_add'):
+                    entry = store.add_wave(
+                        wave_name, uploaded_file.getvalue(), uploaded_file.name, sheet_name=sheet_name
+                    )
+            except (UnsupportedFileType, ValueError) as e:
+                st.sidebar.error(f"Gelombang gagal disimpan: {e}")
+            else:
+                st.sidebar.success(f"Gelombang '{entry['name']}' tersimpan ({entry['n_rows']} responden).")
+
+    stored_waves = store.waves()
+    selected_waves = st.sidebar.multiselect(
+        "Gelombang yang digabung", options=[wave['name'] for wave in stored_waves],
+        default=[wave['name'] for wave in stored_waves]
+    )
+    waves = tuple((wave['name'], wave['digest']) for wave in stored_waves if wave['name'] in selected_waves)
+    stats_by_wave = get_wave_stats(store, waves)
+    data = get_cumulative_stats(store, waves)
+    dataset_id = data.dataset_id
+elif st.sidebar.checkbox(
+    "Mode streaming (CSV besar)",
+    help="Baca CSV per potongan dan hanya simpan ringkasannya, untuk file yang lebih besar dari RAM."
+) and uploaded_file is not None and uploaded_file.name.endswith('.csv'):
+    chunksize = st.sidebar.number_input(
+        "Baris per potongan", min_value=1_000, value=STREAM_CHUNKSIZE, step=10_000
+    )
+    data = load_stats(uploaded_file, int(chunksize))
+    dataset_id = data.dataset_id
+else:
+    data = load_data(uploaded_file, sheet_name)
+    dataset_id = data.attrs.get('dataset_id', 'demo')
+
+if len(data) > 0:
+    section_options = list(SECTIONS) + ([TREND_SECTION] if stats_by_wave is not None else [])
+    selected_section = st.sidebar.radio("Bagian Laporan", options=section_options)
 
-if not df.empty:
     st.markdown("<div class='main-column'>", unsafe_allow_html=True)
     st.markdown("<div class='header-title'>Dashboard Analisis Survei Restoran</div>", unsafe_allow_html=True)
     st.markdown("<div class='header-subtitle'>Analisis Mendalam dari Respon Konsumen</div>", unsafe_allow_html=True)
-    
-    # --- Analisis Top of Mind & Unaided Awareness ---
-    with st.expander("📊 Frekuensi & Persentase (Top of Mind & Unaided)", expanded=True):
-        col1, col2 = st.columns(2)
-        with col1:
-            st.subheader("Frekuensi Top of Mind (Q1_1)")
-            if 'Q1_1' in df.columns:
-                q1_freq = df['Q1_1'].value_counts().reset_index()
-                q1_freq.columns = ['Restoran', 'Frekuensi']
-                q1_freq['Persentase'] = (q1_freq['Frekuensi'] / len(df) * 100).round(2)
-                st.dataframe(q1_freq, use_container_width=True)
-
-                fig, ax = plt.subplots(figsize=(10, 6))
-                sns.barplot(x='Frekuensi', y='Restoran', data=q1_freq, palette='viridis', ax=ax)
-                ax.set_title('Top of Mind Frequency', fontsize=16)
-                ax.set_xlabel('Frekuensi', fontsize=12)
-                ax.set_ylabel('Restoran', fontsize=12)
-                st.pyplot(fig)
-            else:
-                st.info("Kolom Q1_1 tidak ditemukan.")
-    
-        with col2:
-            st.subheader("Frekuensi Unaided Awareness (Q1_1, Q2_1 - Q2_5)")
-            if any(col in df.columns for col in ['Q1_1', 'Q2_1', 'Q2_2', 'Q2_3', 'Q2_4', 'Q2_5']):
-                unaided_q1 = df['Q1_1'].dropna() if 'Q1_1' in df.columns else pd.Series()
-                unaided_q2 = process_multi_response(df, ['Q2'])
-                unaided_combined = pd.concat([unaided_q1, unaided_q2], ignore_index=True)
-                
-                if not unaided_combined.empty:
-                    unaided_freq = unaided_combined.value_counts().reset_index()
-                    unaided_freq.columns = ['Restoran', 'Frekuensi']
-                    st.dataframe(unaided_freq, use_container_width=True)
-                    
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    sns.barplot(x='Frekuensi', y='Restoran', data=unaided_freq, palette='magma', ax=ax)
-                    ax.set_title('Unaided Awareness Frequency', fontsize=16)
-                    ax.set_xlabel('Frekuensi', fontsize=12)
-                    ax.set_ylabel('Restoran', fontsize=12)
-                    st.pyplot(fig)
-                else:
-                    st.info("Tidak ada data untuk unaided awareness.")
-            else:
-                st.info("Kolom untuk unaided awareness tidak ditemukan.")
-
-    # --- Analisis Total Awareness ---
-    with st.expander("📈 Total Awareness"):
-        st.subheader("Frekuensi Total Awareness (Q3_1 - Q3_9)")
-        total_awareness_cols = [f'Q3_{i}' for i in range(1, 10)]
-        if any(col in df.columns for col in total_awareness_cols):
-            total_awareness_combined = process_multi_response(df, ['Q3'])
-            if not total_awareness_combined.empty:
-                total_awareness_freq = total_awareness_combined.value_counts().reset_index()
-                total_awareness_freq.columns = ['Restoran', 'Frekuensi']
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.dataframe(total_awareness_freq, use_container_width=True)
-                with col2:
-                    fig, ax = plt.subplots(figsize=(10, 6))
-                    sns.barplot(x='Frekuensi', y='Restoran', data=total_awareness_freq, palette='plasma', ax=ax)
-                    ax.set_title('Total Awareness Frequency', fontsize=16)
-                    ax.set_xlabel('Frekuensi', fontsize=12)
-                    ax.set_ylabel('Restoran', fontsize=12)
-                    st.pyplot(fig)
-            else:
-                st.info("Tidak ada data untuk total awareness.")
-        else:
-            st.info("Kolom untuk total awareness tidak ditemukan.")
-
-    # --- Analisis Brand Image ---
-    with st.expander("🖼️ Brand Image"):
-        st.subheader("Frekuensi Brand Image (Q15_1 - Q15_8)")
-        brand_image_cols = [f'Q15_{i}' for i in range(1, 9)]
-        
-        for col in brand_image_cols:
-            if col in df.columns and not df[col].isnull().all():
-                st.markdown(f"**{col}:**")
-                
-                # --- Perbaikan: Ganti baris di bawah ini ---
-                freq_data = df[col].value_counts().reset_index()
-                freq_data.columns = ['Respons', 'Frekuensi']
-                # --- Akhir Perbaikan ---
-                
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.dataframe(freq_data, use_container_width=True)
-                with col2:
-                    fig, ax = plt.subplots(figsize=(8, 5))
-                    sns.barplot(x='Frekuensi', y='Respons', data=freq_data, palette='coolwarm', ax=ax)
-                    ax.set_title(f'Frekuensi {col}', fontsize=14)
-                    st.pyplot(fig)
-            else:
-                st.info(f"Tidak ada data untuk kolom {col}.")
-    
-    # --- Analisis Skala Likert (Rata-rata) ---
-    with st.expander("📊 Rata-rata Skala Likert"):
-        st.subheader("Visualisasi Rata-rata Likert")
-        col1, col2, col3 = st.columns(3)
-        
-        # Tingkat Kepentingan (Q16_1 - Q19_5)
-        with col1:
-            st.subheader("1. Tingkat Kepentingan")
-            importance_cols = [f'Q{i}_{j}' for i in range(16, 20) for j in range(1, 6)]
-            importance_avg = calculate_likert_average(df, importance_cols)
-            if not importance_avg.empty:
-                st.dataframe(importance_avg.style.background_gradient(cmap='YlGnBu').format(precision=2), use_container_width=True)
-            else:
-                st.info("Tidak ada data untuk tingkat kepentingan.")
-
-        # Tingkat Kepuasan (Q20_1 - Q24_5)
-        with col2:
-            st.subheader("2. Tingkat Kepuasan")
-            satisfaction_cols = [f'Q{i}_{j}' for i in range(20, 25) for j in range(1, 6)]
-            satisfaction_avg = calculate_likert_average(df, satisfaction_cols)
-            if not satisfaction_avg.empty:
-                st.dataframe(satisfaction_avg.style.background_gradient(cmap='YlOrRd').format(precision=2), use_container_width=True)
-            else:
-                st.info("Tidak ada data untuk tingkat kepuasan.")
-
-        # Tingkat Persesuaian (Q25_1 - Q28_2)
-        with col3:
-            st.subheader("3. Tingkat Persesuaian")
-            agreement_cols = [f'Q{i}_{j}' for i in range(25, 29) for j in range(1, 5)]
-            agreement_avg = calculate_likert_average(df, agreement_cols)
-            if not agreement_avg.empty:
-                st.dataframe(agreement_avg.style.background_gradient(cmap='PuBu').format(precision=2), use_container_width=True)
-            else:
-                st.info("Tidak ada data untuk tingkat persesuaian.")
-
-        if not importance_avg.empty or not satisfaction_avg.empty or not agreement_avg.empty:
-            st.subheader("Visualisasi Rata-rata Likert")
-            likert_avgs = pd.concat([
-                importance_avg.T if not importance_avg.empty else pd.DataFrame(),
-                satisfaction_avg.T if not satisfaction_avg.empty else pd.DataFrame(),
-                agreement_avg.T if not agreement_avg.empty else pd.DataFrame()
-            ])
-            
-            fig, ax = plt.subplots(figsize=(15, 8))
-            likert_avgs.T.plot(kind='bar', ax=ax, rot=45, cmap='cividis')
-            ax.set_title('Rata-rata Skala Likert Berdasarkan Kategori', fontsize=16)
-            ax.set_ylabel('Rata-rata Skor', fontsize=12)
-            ax.set_xlabel('Pertanyaan', fontsize=12)
-            plt.tight_layout()
-            st.pyplot(fig)
-        else:
-            st.info("Tidak ada data Likert yang tersedia untuk visualisasi.")
-    
-    # --- Conceptual Mapping (Crosstab) ---
-    with st.expander("🗺️ Pemetaan Konseptual (Tabel Silang)"):
-        st.subheader("Tabel Silang (Crosstab)")
-        st.write("Pilih 2 parameter untuk membuat tabel silang. Data yang akan digunakan adalah dari Skala Likert.")
-        
-        all_likert_cols = [
-            col for col in df.columns if re.match(r'Q(1[5-9]|2[0-8])_\d+', col)
-        ]
-        
-        if not all_likert_cols:
-            st.info("Tidak ada kolom Likert yang ditemukan untuk analisis ini.")
+
+    st.markdown(f"### {selected_section}")
+    with measure(f"section:{selected_section}", rows=len(data)):
+        if selected_section == TREND_SECTION:
+            render_trend_section(data, dataset_id, stats_by_wave)
         else:
-            likert_df = df[['S1', 'S2'] + all_likert_cols].copy()
-            
-            likert_mapping = {
-                'Sangat Tidak Setuju': 1, 'Tidak Setuju': 2, 'Netral': 3, 'Setuju': 4, 'Sangat Setuju': 5,
-                'Sangat Tidak Penting': 1, 'Tidak Penting': 2, 'Netral': 3, 'Penting': 4, 'Sangat Penting': 5,
-                'Sangat Tidak Puas': 1, 'Tidak Puas': 2, 'Netral': 3, 'Puas': 4, 'Sangat Puas': 5
-            }
-            
-            for col in all_likert_cols:
-                likert_df[col] = likert_df[col].map(likert_mapping)
-            
-            likert_options = ["Tingkat Kepentingan", "Tingkat Kepuasan", "Tingkat Persesuaian"]
-            pivot_options = ["Jenis Kelamin (S1)", "Usia (S2)"]
-            
-            selected_likert = st.selectbox("Pilih Tipe Analisis:", options=likert_options)
-            selected_pivot = st.selectbox("Pilih Parameter Pivot:", options=pivot_options)
-            
-            cols_to_pivot = []
-            if selected_likert == "Tingkat Kepentingan":
-                cols_to_pivot = [col for col in all_likert_cols if re.match(r'Q(1[6-9])_\d+', col)]
-            elif selected_likert == "Tingkat Kepuasan":
-                cols_to_pivot = [col for col in all_likert_cols if re.match(r'Q(2[0-4])_\d+', col)]
-            else:
-                cols_to_pivot = [col for col in all_likert_cols if re.match(r'Q(2[5-8])_\d+', col)]
-            
-            pivot_col = 'S1' if selected_pivot == "Jenis Kelamin (S1)" else 'S2'
-            
-            if pivot_col in likert_df.columns and cols_to_pivot:
-                pivot_table = likert_df.groupby(pivot_col)[cols_to_pivot].mean().T
-                pivot_table.columns = pivot_table.columns.astype(str)
-                
-                st.dataframe(pivot_table.style.background_gradient(cmap='viridis', axis=None).format(precision=2), use_container_width=True)
-                
-                fig, ax = plt.subplots(figsize=(15, 8))
-                pivot_table.plot(kind='bar', ax=ax, rot=45)
-                ax.set_title(f'Tabel Silang {selected_likert} berdasarkan {selected_pivot}', fontsize=16)
-                ax.set_ylabel('Rata-rata Skor', fontsize=12)
-                plt.tight_layout()
-                st.pyplot(fig)
-            else:
-                st.info("Kolom yang dipilih tidak ditemukan dalam data.")
-    
+            SECTIONS[selected_section](data, dataset_id)
+
     st.markdown("</div>", unsafe_allow_html=True)
+elif wave_mode:
+    st.info("Belum ada gelombang yang dipilih. Unggah file lalu simpan sebagai gelombang baru.")
 else:
     st.info("Silakan unggah file data atau gunakan data demo yang telah disediakan.")
+
+perf_recorder = get_perf_recorder()
+if perf_recorder is not None:
+    render_perf_panel(perf_recorder)
+    render_dataset_store_panel(get_dataset_store())
+    if PERF_LOG_PATH:
+        perf_recorder.append_jsonl(PERF_LOG_PATH)